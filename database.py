@@ -1,24 +1,98 @@
 import asyncio
+import json
 import logging
-from collections.abc import Iterable
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Optional
+from typing import Any, Awaitable, Callable, Mapping, Optional
 
 import aiosqlite
 
 logger = logging.getLogger(__name__)
 
+GLOBAL_EFFICIENCY_CONFIG_KEY = "global_efficiency"
+DEFAULT_GLOBAL_EFFICIENCY = Decimal("100")
+LOOKUP_CACHE_SIZE = 1024
+STATEMENT_CACHE_SIZE = 256
+
+# Quantities and prices are stored as INTEGER millionths ("micro-units") so that
+# Decimal values are kept exactly to six places instead of going through float.
+_SCALE = Decimal(1_000_000)
+_MAX_STORED = 2**63 - 1
+
+# Connection tuning applied on every ``Database.connect``. WAL lets readers
+# proceed while a write is in progress and, together with ``synchronous=NORMAL``,
+# avoids an fsync per commit. ``busy_timeout`` matches sqlite3's default
+# connect timeout but is stated here so it can be tuned with the rest.
+DEFAULT_PRAGMAS: dict[str, str] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": "-64000",
+    "mmap_size": "268435456",
+    "busy_timeout": "5000",
+}
+
+# Persistent database settings that cannot be changed over a read-only
+# connection.
+_READ_WRITE_PRAGMAS = frozenset({"journal_mode"})
+
+
+_LIKE_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
 
 def _escape_like(text: str) -> str:
     """Escape characters with special meaning in LIKE patterns."""
 
-    return (
-        text.replace("\\", "\\\\")
-        .replace("%", "\\%")
-        .replace("_", "\\_")
-    )
+    return text.translate(_LIKE_ESCAPE_TABLE)
+
+
+def _contains_pattern(query: str) -> str:
+    """Build a ``LIKE ... ESCAPE '\\'`` pattern matching *query* as a substring."""
+
+    return f"%{_escape_like(query)}%"
+
+
+def _to_stored(value: Decimal) -> int:
+    """Convert a Decimal to integer micro-units, rounding half to even."""
+
+    if not value.is_finite():
+        raise ValueError(f"Cannot store non-finite value '{value}'")
+    stored = int((value * _SCALE).to_integral_value())
+    if stored == 0 and value != 0:
+        raise ValueError(f"Value '{value}' is too small to store")
+    if not -_MAX_STORED - 1 <= stored <= _MAX_STORED:
+        raise ValueError(f"Value '{value}' is too large to store")
+    return stored
+
+
+def _from_stored(value: int) -> Decimal:
+    """Convert integer micro-units back to a Decimal."""
+
+    return Decimal(value) / _SCALE
+
+
+def _to_stored_optional(value: Optional[Decimal]) -> Optional[int]:
+    return None if value is None else _to_stored(value)
+
+
+def _from_stored_optional(value: Optional[int]) -> Optional[Decimal]:
+    return None if value is None else _from_stored(value)
+
+
+def _decode_components(components_json: Optional[str]) -> list[dict[str, Any]]:
+    """Decode a JSON component list built by ``get_recipe``."""
+
+    return [
+        {
+            "resource_name": component["resource_name"],
+            "quantity": _from_stored(component["quantity"]),
+        }
+        for component in json.loads(components_json or "[]")
+    ]
 
 
 @dataclass(frozen=True)
@@ -40,12 +114,138 @@ class CircularRecipeReferenceError(RuntimeError):
     """Raised when recipes reference each other in a cycle."""
 
 
-Migration = Callable[[aiosqlite.Connection], Awaitable[None]]
+async def _fetchall(
+    conn: aiosqlite.Connection, sql: str, parameters: Iterable[Any] = ()
+) -> list[aiosqlite.Row]:
+    """Execute *sql* and return all rows in a single worker-thread round trip."""
+
+    return list(await conn.execute_fetchall(sql, parameters))
+
+
+async def _fetchone(
+    conn: aiosqlite.Connection, sql: str, parameters: Iterable[Any] = ()
+) -> Optional[aiosqlite.Row]:
+    """Like :func:`_fetchall` for statements that yield at most one row."""
+
+    rows = await _fetchall(conn, sql, parameters)
+    return rows[0] if rows else None
+
+
+async def _load_recipe_graph(
+    conn: aiosqlite.Connection, roots: list[str]
+) -> tuple[dict[str, dict[str, Any]], dict[str, Decimal]]:
+    """Load everything needed to price *roots* in a single query.
+
+    Returns the recipes reachable from *roots* through their components, each
+    reduced to ``name``, ``output_quantity`` and ``components`` (not a full
+    ``get_recipe`` result), and the unit prices of the reachable names that are
+    not recipes. ``UNION`` deduplicates names, so the walk
+    terminates even for circular recipes.
+    """
+
+    rows = await _fetchall(
+        conn,
+        """
+        WITH RECURSIVE reachable(name) AS (
+            SELECT value FROM json_each(?)
+            UNION
+            SELECT rc.resource_name
+            FROM reachable
+            JOIN recipes AS r ON r.name = reachable.name
+            JOIN recipe_components AS rc ON rc.recipe_id = r.id
+        )
+        SELECT
+            reachable.name,
+            r.output_quantity,
+            rc.resource_name,
+            rc.quantity,
+            res.unit_price
+        FROM reachable
+        LEFT JOIN recipes AS r ON r.name = reachable.name
+        LEFT JOIN recipe_components AS rc ON rc.recipe_id = r.id
+        LEFT JOIN resources AS res ON res.name = reachable.name
+        ORDER BY reachable.name, rc.resource_name
+        """,
+        (json.dumps(roots),),
+    )
+    recipes: dict[str, dict[str, Any]] = {}
+    prices: dict[str, Decimal] = {}
+    for name, output_quantity, resource_name, quantity, unit_price in rows:
+        if output_quantity is not None:
+            recipe = recipes.setdefault(
+                name,
+                {
+                    "name": name,
+                    "output_quantity": _from_stored(output_quantity),
+                    "components": [],
+                },
+            )
+            if resource_name is not None:
+                recipe["components"].append(
+                    {"resource_name": resource_name, "quantity": _from_stored(quantity)}
+                )
+        elif unit_price is not None:
+            prices[name] = _from_stored(unit_price)
+    return recipes, prices
+
+
+_MISSING: Any = object()
+
+
+class _LRUCache:
+    """Small LRU mapping for lookups that only change through ``Database`` writes.
+
+    ``generation`` is bumped on every invalidation; readers capture it before
+    querying and pass it to :meth:`put`, so a result fetched concurrently with
+    a write is never stored.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: str) -> Any:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return _MISSING
+        return self._data[key]
+
+    def put(self, key: str, value: Any, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def discard(self, *keys: str) -> None:
+        self.generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+
+
+# Migrations receive the set of ``recipes`` columns, read once before the
+# migrations run; steps that add a column must record it in the set.
+Migration = Callable[[aiosqlite.Connection, set[str]], Awaitable[None]]
 
 
-async def _migration_1_initialise_schema_version(conn: aiosqlite.Connection) -> None:
+async def _get_recipe_columns(conn: aiosqlite.Connection) -> set[str]:
+    rows = await _fetchall(conn, "SELECT name FROM pragma_table_info('recipes')")
+    return {row[0] for row in rows}
+
+
+async def _migration_1_initialise_schema_version(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
     """Initial migration that establishes schema version tracking."""
 
+    del conn, recipe_columns
     logger.info("Выполняю миграцию схемы #1: инициализация версии схемы")
     # Baseline migration does not need to modify existing tables because the
     # schema is created in ``_initialise_schema`` using idempotent statements.
@@ -53,35 +253,35 @@ async def _migration_1_initialise_schema_version(conn: aiosqlite.Connection) ->
     # schema version entry in the config table.
 
 
-async def _migration_2_add_recipe_status(conn: aiosqlite.Connection) -> None:
+async def _migration_2_add_recipe_status(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
     """Add the ``is_temporary`` flag to recipes."""
 
     logger.info(
         "Выполняю миграцию схемы #2: добавление признака временного рецепта"
     )
-    cursor = await conn.execute("PRAGMA table_info(recipes)")
-    columns = [row["name"] for row in await cursor.fetchall()]
-    await cursor.close()
-    if "is_temporary" in columns:
+    if "is_temporary" in recipe_columns:
         logger.info("Столбец is_temporary уже существует, миграция пропущена")
         return
     await conn.execute(
         "ALTER TABLE recipes ADD COLUMN is_temporary INTEGER NOT NULL DEFAULT 0"
     )
+    recipe_columns.add("is_temporary")
 
 
-async def _migration_3_add_ship_type_support(conn: aiosqlite.Connection) -> None:
+async def _migration_3_add_ship_type_support(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
     """Add support for ship types and their efficiencies."""
 
     logger.info(
         "Выполняю миграцию схемы #3: поддержка типов кораблей и их эффективности"
     )
-    cursor = await conn.execute("PRAGMA table_info(recipes)")
-    columns = [row["name"] for row in await cursor.fetchall()]
-    await cursor.close()
-    if "ship_type" not in columns:
+    if "ship_type" not in recipe_columns:
         logger.info("Добавляю столбец ship_type в таблицу recipes")
         await conn.execute("ALTER TABLE recipes ADD COLUMN ship_type TEXT")
+        recipe_columns.add("ship_type")
     else:
         logger.info("Столбец ship_type уже существует, пропускаю добавление")
 
@@ -95,27 +295,27 @@ async def _migration_3_add_ship_type_support(conn: aiosqlite.Connection) -> None
     )
 
 
-async def _migration_4_add_recipe_cost_fields(conn: aiosqlite.Connection) -> None:
+async def _migration_4_add_recipe_cost_fields(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
     """Add blueprint and creation cost fields to recipes."""
 
     logger.info(
         "Выполняю миграцию схемы #4: добавление стоимостей чертежа и создания"
     )
-    cursor = await conn.execute("PRAGMA table_info(recipes)")
-    columns = [row["name"] for row in await cursor.fetchall()]
-    await cursor.close()
-
-    if "blueprint_cost" not in columns:
+    if "blueprint_cost" not in recipe_columns:
         logger.info("Добавляю столбец blueprint_cost в таблицу recipes")
         await conn.execute("ALTER TABLE recipes ADD COLUMN blueprint_cost REAL")
+        recipe_columns.add("blueprint_cost")
     else:
         logger.info(
             "Столбец blueprint_cost уже существует, пропускаю добавление"
         )
 
-    if "creation_cost" not in columns:
+    if "creation_cost" not in recipe_columns:
         logger.info("Добавляю столбец creation_cost в таблицу recipes")
         await conn.execute("ALTER TABLE recipes ADD COLUMN creation_cost REAL")
+        recipe_columns.add("creation_cost")
     else:
         logger.info(
             "Столбец creation_cost уже существует, пропускаю добавление"
@@ -123,10 +323,11 @@ async def _migration_4_add_recipe_cost_fields(conn: aiosqlite.Connection) -> Non
 
 
 async def _migration_5_add_blueprint_components_table(
-    conn: aiosqlite.Connection,
+    conn: aiosqlite.Connection, recipe_columns: set[str]
 ) -> None:
     """Introduce a table for blueprint resource requirements."""
 
+    del recipe_columns
     logger.info(
         "Выполняю миграцию схемы #5: создание таблицы компонентов чертежей"
     )
@@ -143,17 +344,14 @@ async def _migration_5_add_blueprint_components_table(
 
 
 async def _migration_6_add_blueprint_creation_cost(
-    conn: aiosqlite.Connection,
+    conn: aiosqlite.Connection, recipe_columns: set[str]
 ) -> None:
     """Add separate storage for blueprint creation cost."""
 
     logger.info(
         "Выполняю миграцию схемы #6: добавление стоимости создания чертежа",
     )
-    cursor = await conn.execute("PRAGMA table_info(recipes)")
-    columns = [row["name"] for row in await cursor.fetchall()]
-    await cursor.close()
-    if "blueprint_creation_cost" in columns:
+    if "blueprint_creation_cost" in recipe_columns:
         logger.info(
             "Столбец blueprint_creation_cost уже существует, миграция пропущена",
         )
@@ -161,6 +359,210 @@ async def _migration_6_add_blueprint_creation_cost(
     await conn.execute(
         "ALTER TABLE recipes ADD COLUMN blueprint_creation_cost REAL",
     )
+    recipe_columns.add("blueprint_creation_cost")
+
+
+async def _convert_columns_to_micro_units(
+    conn: aiosqlite.Connection, table: str, columns: Iterable[str]
+) -> None:
+    """Rewrite REAL *columns* of *table* as INTEGER micro-units in place."""
+
+    rows = await _fetchall(
+        conn,
+        "SELECT name, type, \"notnull\", dflt_value FROM pragma_table_info(?)",
+        (table,),
+    )
+    column_info = {row[0]: row[1:] for row in rows}
+    for column in columns:
+        declared_type, not_null, default = column_info[column]
+        if declared_type.upper() == "INTEGER":
+            logger.info(
+                "Столбец %s.%s уже хранится в микроединицах, пропускаю",
+                table,
+                column,
+            )
+            continue
+        logger.info("Перевожу столбец %s.%s в микроединицы", table, column)
+        # A REAL column would coerce the integers back to floats, so the
+        # values are copied into a fresh INTEGER column which then takes the
+        # original name. None of these columns is indexed or referenced by a
+        # constraint, so they can be dropped in place.
+        staged = f"{column}_micro"
+        constraint = ""
+        if default is not None:
+            constraint = f" DEFAULT {_to_stored(Decimal(default))}"
+        if not_null:
+            constraint = f" NOT NULL{constraint}"
+        await conn.execute(
+            f"ALTER TABLE {table} ADD COLUMN {staged} INTEGER{constraint}"
+        )
+        await conn.execute(
+            f"UPDATE {table} SET {staged} = "
+            f"CAST(ROUND({column} * {_SCALE}) AS INTEGER)"
+        )
+        await conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        await conn.execute(f"ALTER TABLE {table} RENAME COLUMN {staged} TO {column}")
+
+
+async def _rebuild_table_in_micro_units(
+    conn: aiosqlite.Connection,
+    table: str,
+    definition: str,
+    columns: Iterable[str],
+    indexes: Iterable[str] = (),
+) -> None:
+    """Recreate *table* from *definition*, copying REAL *columns* as micro-units.
+
+    Unlike :func:`_convert_columns_to_micro_units` this keeps the column order
+    and constraints identical to a freshly created table, but dropping the
+    table would cascade into its children, so it is only used for tables no
+    foreign key refers to. *indexes* are recreated afterwards.
+    """
+
+    rows = await _fetchall(
+        conn, "SELECT name, type FROM pragma_table_info(?)", (table,)
+    )
+    column_types = {row[0]: row[1] for row in rows}
+    pending = {
+        column for column in columns if column_types[column].upper() != "INTEGER"
+    }
+    if not pending:
+        logger.info(
+            "Таблица %s уже хранит значения в микроединицах, пропускаю", table
+        )
+        return
+    logger.info("Перестраиваю таблицу %s для хранения в микроединицах", table)
+    staged = f"{table}_micro"
+    names = ", ".join(column_types)
+    values = ", ".join(
+        f"CAST(ROUND({name} * {_SCALE}) AS INTEGER)" if name in pending else name
+        for name in column_types
+    )
+    await conn.execute(f"CREATE TABLE {staged} ({definition})")
+    await conn.execute(
+        f"INSERT INTO {staged} ({names}) SELECT {values} FROM {table}"
+    )
+    await conn.execute(f"DROP TABLE {table}")
+    await conn.execute(f"ALTER TABLE {staged} RENAME TO {table}")
+    for statement in indexes:
+        await conn.execute(statement)
+
+
+async def _migration_7_store_decimals_as_micro_units(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
+    """Store quantities and prices as INTEGER micro-units instead of REAL."""
+
+    del recipe_columns
+    logger.info(
+        "Выполняю миграцию схемы #7: хранение количеств и цен в целых микроединицах"
+    )
+    await _rebuild_table_in_micro_units(
+        conn,
+        "resources",
+        """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        unit_price INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        """,
+        ("unit_price",),
+        (
+            "CREATE INDEX IF NOT EXISTS idx_resources_name_nocase "
+            "ON resources(name COLLATE NOCASE)",
+        ),
+    )
+    await _convert_columns_to_micro_units(
+        conn,
+        "recipes",
+        (
+            "output_quantity",
+            "blueprint_cost",
+            "creation_cost",
+            "blueprint_creation_cost",
+        ),
+    )
+    await _rebuild_table_in_micro_units(
+        conn,
+        "recipe_components",
+        """
+        recipe_id INTEGER NOT NULL,
+        resource_name TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+        """,
+        ("quantity",),
+        (
+            "CREATE INDEX IF NOT EXISTS idx_recipe_components_recipe_id "
+            "ON recipe_components(recipe_id)",
+        ),
+    )
+    await _rebuild_table_in_micro_units(
+        conn,
+        "recipe_blueprint_components",
+        """
+        recipe_id INTEGER NOT NULL,
+        resource_name TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+        """,
+        ("quantity",),
+        (
+            "CREATE INDEX IF NOT EXISTS idx_recipe_bp_components_recipe_id "
+            "ON recipe_blueprint_components(recipe_id)",
+        ),
+    )
+
+
+async def _migration_8_store_efficiencies_as_micro_units(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
+    """Store ship type efficiencies as INTEGER micro-units instead of REAL."""
+
+    del recipe_columns
+    logger.info(
+        "Выполняю миграцию схемы #8: хранение эффективности типов кораблей в микроединицах"
+    )
+    await _rebuild_table_in_micro_units(
+        conn,
+        "ship_type_efficiencies",
+        """
+        type TEXT PRIMARY KEY,
+        efficiency INTEGER NOT NULL
+        """,
+        ("efficiency",),
+    )
+
+
+async def _migration_9_normalise_blank_ship_types(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
+    """Store a missing recipe ship type as NULL rather than a blank string."""
+
+    del recipe_columns
+    logger.info(
+        "Выполняю миграцию схемы #9: пустые типы кораблей сохраняются как NULL"
+    )
+    await conn.execute(
+        "UPDATE recipes SET ship_type = NULL WHERE TRIM(ship_type) = ''"
+    )
+
+
+async def _migration_10_index_recipes_by_ship_type(
+    conn: aiosqlite.Connection, recipe_columns: set[str]
+) -> None:
+    """Index recipes by ship type for the per-type listings."""
+
+    del recipe_columns
+    logger.info("Выполняю миграцию схемы #10: индекс рецептов по типу корабля")
+    # Created here rather than with the other indexes because databases older
+    # than migration #3 have no ship_type column when the schema is checked.
+    await conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_recipes_ship_type
+            ON recipes(ship_type, name COLLATE NOCASE)
+        """
+    )
 
 
 MIGRATIONS: dict[int, Migration] = {
@@ -170,16 +572,48 @@ MIGRATIONS: dict[int, Migration] = {
     4: _migration_4_add_recipe_cost_fields,
     5: _migration_5_add_blueprint_components_table,
     6: _migration_6_add_blueprint_creation_cost,
+    7: _migration_7_store_decimals_as_micro_units,
+    8: _migration_8_store_efficiencies_as_micro_units,
+    9: _migration_9_normalise_blank_ship_types,
+    10: _migration_10_index_recipes_by_ship_type,
 }
 
 CURRENT_SCHEMA_VERSION = max(MIGRATIONS.keys(), default=0)
 
 
 class Database:
-    def __init__(self, path: str = "zavod.db") -> None:
+    def __init__(
+        self,
+        path: str = "zavod.db",
+        *,
+        pragmas: Optional[Mapping[str, str]] = None,
+    ) -> None:
         self._path = path
+        self._pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
         self._conn: Optional[aiosqlite.Connection] = None
+        # Separate ``mode=ro`` connection for the frequent lookups (see
+        # ``_reader``): it runs on its own worker thread, so under WAL those
+        # reads neither wait behind nor hold up the write connection, and they
+        # only ever see committed data.
+        self._ro_conn: Optional[aiosqlite.Connection] = None
+        # Serialises write methods so that concurrent statements never join an
+        # open transaction. Reads skip it.
         self._lock = asyncio.Lock()
+        self._global_efficiency: Optional[Decimal] = None
+        self._global_efficiency_generation = 0
+        # Whole ship_type_efficiencies table (it holds one row per ship type);
+        # the generation counter plays the same role as in ``_LRUCache``.
+        self._ship_type_efficiencies: Optional[dict[str, Decimal]] = None
+        self._ship_type_efficiencies_generation = 0
+        self._recipe_cache = _LRUCache(LOOKUP_CACHE_SIZE)
+        self._resource_price_cache = _LRUCache(LOOKUP_CACHE_SIZE)
+        # Autocomplete name lists keyed by query; cleared by every write that can
+        # add or remove a recipe, resource or ship type.
+        self._name_list_cache = _LRUCache(LOOKUP_CACHE_SIZE)
+        # calculate_recipe_cost results keyed by recipe and requested efficiency.
+        # A cost depends on every nested recipe, price and efficiency, so any
+        # such write clears the whole cache.
+        self._recipe_cost_cache = _LRUCache(LOOKUP_CACHE_SIZE)
 
     @property
     def path(self) -> str:
@@ -200,19 +634,85 @@ class Database:
             logger.debug("Подключение к базе данных уже установлено")
             return
         logger.info("Открываю подключение к базе данных по пути %s", self._path)
-        conn = await aiosqlite.connect(self._path)
-        conn.row_factory = aiosqlite.Row
-        await conn.execute("PRAGMA foreign_keys = ON;")
-        await self._initialise_schema(conn)
-        await conn.commit()
+        # Autocommit mode: multi-statement writes open their own transactions
+        # explicitly via ``_immediate_transaction``.
+        conn = await aiosqlite.connect(
+            self._path,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        try:
+            conn.row_factory = aiosqlite.Row
+            await conn.execute("PRAGMA foreign_keys = ON;")
+            for pragma, value in self._pragmas.items():
+                if pragma == "journal_mode" and self._path == ":memory:":
+                    # In-memory databases only support the MEMORY/OFF journals.
+                    continue
+                logger.debug("Устанавливаю PRAGMA %s = %s", pragma, value)
+                await conn.execute(f"PRAGMA {pragma} = {value};")
+            await self._initialise_schema(conn)
+            ro_conn = await self._open_read_only_connection()
+        except BaseException:
+            # An unclosed aiosqlite connection keeps its worker thread alive
+            # and would stop the process from exiting.
+            await conn.close()
+            raise
         self._conn = conn
+        self._ro_conn = ro_conn
+        self._invalidate_global_efficiency()
+        self._invalidate_ship_type_efficiencies()
+        self._recipe_cache.clear()
+        self._recipe_cost_cache.clear()
+        self._resource_price_cache.clear()
+        self._name_list_cache.clear()
         logger.info("Подключение к базе данных установлено")
 
+    async def _open_read_only_connection(self) -> Optional[aiosqlite.Connection]:
+        if self._path == ":memory:":
+            return None
+        uri = f"{Path(self._path).resolve().as_uri()}?mode=ro"
+        conn = await aiosqlite.connect(
+            uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        try:
+            conn.row_factory = aiosqlite.Row
+            for pragma, value in self._pragmas.items():
+                if pragma not in _READ_WRITE_PRAGMAS:
+                    await conn.execute(f"PRAGMA {pragma} = {value};")
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    @property
+    def _reader(self) -> aiosqlite.Connection:
+        """Connection used for lock-free reads."""
+
+        conn = self._ro_conn or self._conn
+        if conn is None:
+            raise RuntimeError("Database connection is not initialised")
+        return conn
+
     async def close(self) -> None:
+        if self._ro_conn is not None:
+            await self._ro_conn.close()
+            self._ro_conn = None
         if self._conn is not None:
             logger.info("Закрываю подключение к базе данных")
+            try:
+                await self._conn.execute("PRAGMA optimize;")
+            except Exception as exc:
+                logger.warning(
+                    "Не удалось выполнить PRAGMA optimize перед закрытием: %s", exc
+                )
             await self._conn.close()
             self._conn = None
+            self._invalidate_global_efficiency()
+            self._invalidate_ship_type_efficiencies()
+            self._recipe_cache.clear()
+            self._recipe_cost_cache.clear()
+            self._resource_price_cache.clear()
+            self._name_list_cache.clear()
 
     async def get_statistics(self) -> dict[str, int]:
         """Возвращает агрегированную статистику по базе данных."""
@@ -220,36 +720,29 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        async with self._lock:
-            logger.debug("Собираю статистику по базе данных")
-            cursor = await self._conn.execute("SELECT COUNT(*) AS count FROM recipes")
-            recipe_row = await cursor.fetchone()
-            await cursor.close()
-
-            cursor = await self._conn.execute("SELECT COUNT(*) AS count FROM resources")
-            resource_row = await cursor.fetchone()
-            await cursor.close()
+        logger.debug("Собираю статистику по базе данных")
+        row = await _fetchone(
+            self._reader,
+            """
+            SELECT
+                (SELECT COUNT(*) FROM recipes) AS recipes,
+                (SELECT COUNT(*) FROM resources) AS resources,
+                (SELECT COUNT(*) FROM recipe_components) AS recipe_components
+            """
+        )
 
-            cursor = await self._conn.execute(
-                "SELECT COUNT(*) AS count FROM recipe_components"
-            )
-            components_row = await cursor.fetchone()
-            await cursor.close()
-
-            stats = {
-                "recipes": int(recipe_row["count"] if recipe_row else 0),
-                "resources": int(resource_row["count"] if resource_row else 0),
-                "recipe_components": int(
-                    components_row["count"] if components_row else 0
-                ),
-            }
-            logger.info(
-                "Статистика базы данных: рецептов=%s, ресурсов=%s, компонентов=%s",
-                stats["recipes"],
-                stats["resources"],
-                stats["recipe_components"],
-            )
-            return stats
+        stats = {
+            "recipes": int(row["recipes"] if row else 0),
+            "resources": int(row["resources"] if row else 0),
+            "recipe_components": int(row["recipe_components"] if row else 0),
+        }
+        logger.info(
+            "Статистика базы данных: рецептов=%s, ресурсов=%s, компонентов=%s",
+            stats["recipes"],
+            stats["resources"],
+            stats["recipe_components"],
+        )
+        return stats
 
     async def get_schema_version(self) -> int:
         if self._conn is None:
@@ -257,38 +750,49 @@ class Database:
         return await self._get_schema_version(self._conn)
 
     async def _initialise_schema(self, conn: aiosqlite.Connection) -> None:
+        # PRAGMA user_version mirrors the config schema version once a connect
+        # has fully bootstrapped the file, so later connects skip the DDL sweep.
+        row = await _fetchone(conn, "PRAGMA user_version")
+        if row is not None and row[0] == CURRENT_SCHEMA_VERSION:
+            logger.debug(
+                "Схема базы данных версии %s уже инициализирована",
+                CURRENT_SCHEMA_VERSION,
+            )
+            await self._ensure_global_efficiency(conn)
+            return
+
         logger.debug("Проверяю схему базы данных")
         await conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS resources (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL UNIQUE,
-                unit_price REAL NOT NULL,
+                unit_price INTEGER NOT NULL,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
 
             CREATE TABLE IF NOT EXISTS recipes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL UNIQUE,
-                output_quantity REAL NOT NULL DEFAULT 1,
+                output_quantity INTEGER NOT NULL DEFAULT 1000000,
                 is_temporary INTEGER NOT NULL DEFAULT 0,
                 ship_type TEXT,
-                blueprint_cost REAL,
-                creation_cost REAL,
-                blueprint_creation_cost REAL
+                blueprint_cost INTEGER,
+                creation_cost INTEGER,
+                blueprint_creation_cost INTEGER
             );
 
             CREATE TABLE IF NOT EXISTS recipe_components (
                 recipe_id INTEGER NOT NULL,
                 resource_name TEXT NOT NULL,
-                quantity REAL NOT NULL,
+                quantity INTEGER NOT NULL,
                 FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
             );
 
             CREATE TABLE IF NOT EXISTS recipe_blueprint_components (
                 recipe_id INTEGER NOT NULL,
                 resource_name TEXT NOT NULL,
-                quantity REAL NOT NULL,
+                quantity INTEGER NOT NULL,
                 FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
             );
 
@@ -299,25 +803,40 @@ class Database:
 
             CREATE TABLE IF NOT EXISTS ship_type_efficiencies (
                 type TEXT PRIMARY KEY,
-                efficiency REAL NOT NULL
+                efficiency INTEGER NOT NULL
             );
+
+            CREATE INDEX IF NOT EXISTS idx_recipe_components_recipe_id
+                ON recipe_components(recipe_id);
+
+            CREATE INDEX IF NOT EXISTS idx_recipe_bp_components_recipe_id
+                ON recipe_blueprint_components(recipe_id);
+
+            CREATE INDEX IF NOT EXISTS idx_recipes_name_nocase
+                ON recipes(name COLLATE NOCASE);
+
+            CREATE INDEX IF NOT EXISTS idx_resources_name_nocase
+                ON resources(name COLLATE NOCASE);
             """
         )
-        # Ensure global efficiency entry exists.
+        async with self._immediate_transaction(conn):
+            await self._ensure_global_efficiency(conn)
+            await self._run_migrations(conn)
+            await conn.execute(f"PRAGMA user_version = {CURRENT_SCHEMA_VERSION}")
+        logger.debug("Проверка схемы завершена")
+
+    async def _ensure_global_efficiency(self, conn: aiosqlite.Connection) -> None:
         await conn.execute(
             "INSERT INTO config(key, value) VALUES(?, ?) ON CONFLICT(key) DO NOTHING",
-            ("global_efficiency", "100"),
+            (GLOBAL_EFFICIENCY_CONFIG_KEY, str(DEFAULT_GLOBAL_EFFICIENCY)),
         )
-        await self._run_migrations(conn)
-        logger.debug("Проверка схемы завершена")
 
     async def _get_schema_version(self, conn: aiosqlite.Connection) -> int:
-        cursor = await conn.execute(
+        row = await _fetchone(
+            conn,
             "SELECT value FROM config WHERE key = ?",
             ("schema_version",),
         )
-        row = await cursor.fetchone()
-        await cursor.close()
         if row is None:
             return 0
         raw_value = row["value"]
@@ -358,6 +877,7 @@ class Database:
             current_version,
             CURRENT_SCHEMA_VERSION,
         )
+        recipe_columns = await _get_recipe_columns(conn)
         for next_version in range(current_version + 1, CURRENT_SCHEMA_VERSION + 1):
             migration = MIGRATIONS.get(next_version)
             if migration is None:
@@ -365,7 +885,7 @@ class Database:
                     f"No migration available for schema version {next_version}"
                 )
             logger.debug("Применяю миграцию #%s", next_version)
-            await migration(conn)
+            await migration(conn, recipe_columns)
             await self._set_schema_version(conn, next_version)
 
         logger.info(
@@ -373,6 +893,84 @@ class Database:
             CURRENT_SCHEMA_VERSION,
         )
 
+    @asynccontextmanager
+    async def _immediate_transaction(
+        self, conn: aiosqlite.Connection
+    ) -> AsyncIterator[None]:
+        """Run the enclosed statements in a single ``BEGIN IMMEDIATE`` transaction."""
+
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            await conn.rollback()
+            # Lock-free readers on this connection may have cached rows from the
+            # rolled-back transaction.
+            self._recipe_cache.clear()
+            self._recipe_cost_cache.clear()
+            self._resource_price_cache.clear()
+            self._name_list_cache.clear()
+            raise
+        await conn.commit()
+
+    async def _replace_components(
+        self,
+        conn: aiosqlite.Connection,
+        table: str,
+        recipe_id: int,
+        components: list[RecipeComponent],
+    ) -> None:
+        """Make *table* hold exactly *components* for the recipe and upsert prices.
+
+        Rows that already match a component are left in place, so re-saving a
+        recipe only writes the components that actually changed.
+        """
+
+        rows = await _fetchall(
+            conn,
+            f"SELECT rowid, resource_name, quantity FROM {table} WHERE recipe_id = ?",
+            (recipe_id,),
+        )
+        stale: dict[tuple[str, int], list[int]] = {}
+        for rowid, resource_name, quantity in rows:
+            stale.setdefault((resource_name, quantity), []).append(rowid)
+
+        component_rows = []
+        price_rows = []
+        for component in components:
+            key = (component.resource_name, _to_stored(component.quantity))
+            kept = stale.get(key)
+            if kept:
+                kept.pop()
+            else:
+                component_rows.append((recipe_id, *key))
+            price_rows.append(
+                (component.resource_name, _to_stored(component.unit_price))
+            )
+        removed_rows = [(rowid,) for rowids in stale.values() for rowid in rowids]
+        if removed_rows:
+            await conn.executemany(
+                f"DELETE FROM {table} WHERE rowid = ?", removed_rows
+            )
+        if component_rows:
+            await conn.executemany(
+                f"""
+                INSERT INTO {table}(recipe_id, resource_name, quantity)
+                VALUES(?, ?, ?)
+                """,
+                component_rows,
+            )
+        await conn.executemany(
+            """
+            INSERT INTO resources(name, unit_price)
+            VALUES(?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                unit_price = excluded.unit_price,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            price_rows,
+        )
+
     async def add_recipe(
         self,
         name: str,
@@ -386,82 +984,51 @@ class Database:
             raise RuntimeError("Database connection is not initialised")
 
         async with self._lock:
+            materialised_components = list(components)
             logger.info("Сохраняю рецепт '%s'", name)
             temporary_flag = 1 if is_temporary else 0
             normalised_ship_type = (ship_type or "").strip() or None
-            cursor = await self._conn.execute(
-                "SELECT id FROM recipes WHERE name = ?",
-                (name,),
-            )
-            row = await cursor.fetchone()
-            await cursor.close()
-
-            if row is None:
-                logger.debug("Рецепт '%s' не найден, создаю новую запись", name)
-                cursor = await self._conn.execute(
+            async with self._immediate_transaction(self._conn):
+                row = await _fetchone(
+                    self._conn,
                     """
                     INSERT INTO recipes(name, output_quantity, is_temporary, ship_type)
                     VALUES(?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        output_quantity = excluded.output_quantity,
+                        is_temporary = excluded.is_temporary,
+                        ship_type = excluded.ship_type
+                    RETURNING id
                     """,
                     (
                         name,
-                        float(output_quantity),
+                        _to_stored(output_quantity),
                         temporary_flag,
                         normalised_ship_type,
                     ),
                 )
-                recipe_id = cursor.lastrowid
-                await cursor.close()
-            else:
                 recipe_id = row["id"]
-                logger.debug(
-                    "Рецепт '%s' найден (id=%s), обновляю существующую запись", name, recipe_id
-                )
-                await self._conn.execute(
-                    """
-                    UPDATE recipes
-                    SET output_quantity = ?, is_temporary = ?, ship_type = ?
-                    WHERE id = ?
-                    """,
-                    (
-                        float(output_quantity),
-                        temporary_flag,
-                        normalised_ship_type,
-                        recipe_id,
-                    ),
-                )
-                await self._conn.execute(
-                    "DELETE FROM recipe_components WHERE recipe_id = ?",
-                    (recipe_id,),
-                )
-
-            for component in components:
-                logger.debug(
-                    "Добавляю компонент рецепта: рецепт=%s ресурс=%s количество=%s цена=%s",
-                    name,
-                    component.resource_name,
-                    component.quantity,
-                    component.unit_price,
-                )
-                await self._conn.execute(
-                    """
-                    INSERT INTO recipe_components(recipe_id, resource_name, quantity)
-                    VALUES(?, ?, ?)
-                    """,
-                    (recipe_id, component.resource_name, float(component.quantity)),
-                )
-                await self._conn.execute(
-                    """
-                    INSERT INTO resources(name, unit_price)
-                    VALUES(?, ?)
-                    ON CONFLICT(name) DO UPDATE SET
-                        unit_price = excluded.unit_price,
-                        updated_at = CURRENT_TIMESTAMP
-                    """,
-                    (component.resource_name, float(component.unit_price)),
+                logger.debug("Рецепт '%s' сохранён в таблице recipes (id=%s)", name, recipe_id)
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    for component in materialised_components:
+                        logger.debug(
+                            "Добавляю компонент рецепта: рецепт=%s ресурс=%s количество=%s цена=%s",
+                            name,
+                            component.resource_name,
+                            component.quantity,
+                            component.unit_price,
+                        )
+                await self._replace_components(
+                    self._conn, "recipe_components", recipe_id, materialised_components
                 )
 
-            await self._conn.commit()
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
+            self._resource_price_cache.discard(
+                *(component.resource_name for component in materialised_components)
+            )
+            self._name_list_cache.clear()
             logger.info("Рецепт '%s' сохранён", name)
 
     async def set_recipe_temporary(self, name: str, is_temporary: bool) -> bool:
@@ -474,13 +1041,13 @@ class Database:
                 name,
                 is_temporary,
             )
-            cursor = await self._conn.execute(
-                "UPDATE recipes SET is_temporary = ? WHERE name = ?",
+            row = await _fetchone(
+                self._conn,
+                "UPDATE recipes SET is_temporary = ? WHERE name = ? RETURNING id",
                 (1 if is_temporary else 0, name),
             )
-            await self._conn.commit()
-            updated = cursor.rowcount > 0
-            await cursor.close()
+            updated = row is not None
+            self._recipe_cache.discard(name)
             if not updated:
                 logger.warning(
                     "Рецепт '%s' не найден при обновлении статуса временности",
@@ -494,13 +1061,15 @@ class Database:
 
         async with self._lock:
             logger.info("Удаляю рецепт '%s'", name)
-            cursor = await self._conn.execute(
-                "DELETE FROM recipes WHERE name = ?",
+            row = await _fetchone(
+                self._conn,
+                "DELETE FROM recipes WHERE name = ? RETURNING id",
                 (name,),
             )
-            await self._conn.commit()
-            deleted = cursor.rowcount > 0
-            await cursor.close()
+            deleted = row is not None
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
+            self._name_list_cache.clear()
             if deleted:
                 logger.info("Рецепт '%s' удалён", name)
             else:
@@ -517,13 +1086,14 @@ class Database:
             logger.info(
                 "Обновляю стоимость чертежа рецепта '%s': %s", name, cost
             )
-            cursor = await self._conn.execute(
-                "UPDATE recipes SET blueprint_cost = ? WHERE name = ?",
-                (float(cost) if cost is not None else None, name),
+            row = await _fetchone(
+                self._conn,
+                "UPDATE recipes SET blueprint_cost = ? WHERE name = ? RETURNING id",
+                (_to_stored_optional(cost), name),
             )
-            await self._conn.commit()
-            updated = cursor.rowcount > 0
-            await cursor.close()
+            updated = row is not None
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
             if not updated:
                 logger.warning(
                     "Не удалось обновить стоимость чертежа: рецепт '%s' не найден",
@@ -545,13 +1115,14 @@ class Database:
                 name,
                 cost,
             )
-            cursor = await self._conn.execute(
-                "UPDATE recipes SET blueprint_creation_cost = ? WHERE name = ?",
-                (float(cost) if cost is not None else None, name),
+            row = await _fetchone(
+                self._conn,
+                "UPDATE recipes SET blueprint_creation_cost = ? WHERE name = ? RETURNING id",
+                (_to_stored_optional(cost), name),
             )
-            await self._conn.commit()
-            updated = cursor.rowcount > 0
-            await cursor.close()
+            updated = row is not None
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
             if not updated:
                 logger.warning(
                     "Не удалось обновить стоимость создания чертежа: рецепт '%s' не найден",
@@ -571,13 +1142,14 @@ class Database:
             logger.info(
                 "Обновляю цену создания рецепта '%s': %s", name, cost
             )
-            cursor = await self._conn.execute(
-                "UPDATE recipes SET creation_cost = ? WHERE name = ?",
-                (float(cost) if cost is not None else None, name),
+            row = await _fetchone(
+                self._conn,
+                "UPDATE recipes SET creation_cost = ? WHERE name = ? RETURNING id",
+                (_to_stored_optional(cost), name),
             )
-            await self._conn.commit()
-            updated = cursor.rowcount > 0
-            await cursor.close()
+            updated = row is not None
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
             if not updated:
                 logger.warning(
                     "Не удалось обновить цену создания: рецепт '%s' не найден",
@@ -601,56 +1173,43 @@ class Database:
                 len(materialised_components),
             )
 
-            cursor = await self._conn.execute(
-                "SELECT id FROM recipes WHERE name = ?",
-                (name,),
-            )
-            row = await cursor.fetchone()
-            await cursor.close()
-            if row is None:
-                logger.warning(
-                    "Не удалось обновить компоненты чертежа: рецепт '%s' не найден",
-                    name,
+            async with self._immediate_transaction(self._conn):
+                row = await _fetchone(
+                    self._conn,
+                    "SELECT id FROM recipes WHERE name = ?",
+                    (name,),
                 )
-                raise RecipeNotFoundError(f"Recipe '{name}' is not defined")
+                if row is None:
+                    logger.warning(
+                        "Не удалось обновить компоненты чертежа: рецепт '%s' не найден",
+                        name,
+                    )
+                    raise RecipeNotFoundError(f"Recipe '{name}' is not defined")
 
-            recipe_id = row["id"]
-            await self._conn.execute(
-                "DELETE FROM recipe_blueprint_components WHERE recipe_id = ?",
-                (recipe_id,),
-            )
+                recipe_id = row["id"]
 
-            for component in materialised_components:
-                logger.debug(
-                    "Добавляю компонент чертежа: рецепт=%s ресурс=%s количество=%s цена=%s",
-                    name,
-                    component.resource_name,
-                    component.quantity,
-                    component.unit_price,
-                )
-                await self._conn.execute(
-                    """
-                    INSERT INTO recipe_blueprint_components(
-                        recipe_id,
-                        resource_name,
-                        quantity
-                    )
-                    VALUES(?, ?, ?)
-                    """,
-                    (recipe_id, component.resource_name, float(component.quantity)),
-                )
-                await self._conn.execute(
-                    """
-                    INSERT INTO resources(name, unit_price)
-                    VALUES(?, ?)
-                    ON CONFLICT(name) DO UPDATE SET
-                        unit_price = excluded.unit_price,
-                        updated_at = CURRENT_TIMESTAMP
-                    """,
-                    (component.resource_name, float(component.unit_price)),
+                if logger.isEnabledFor(logging.DEBUG):
+                    for component in materialised_components:
+                        logger.debug(
+                            "Добавляю компонент чертежа: рецепт=%s ресурс=%s количество=%s цена=%s",
+                            name,
+                            component.resource_name,
+                            component.quantity,
+                            component.unit_price,
+                        )
+                await self._replace_components(
+                    self._conn,
+                    "recipe_blueprint_components",
+                    recipe_id,
+                    materialised_components,
                 )
 
-            await self._conn.commit()
+            self._recipe_cache.discard(name)
+            self._recipe_cost_cache.clear()
+            self._resource_price_cache.discard(
+                *(component.resource_name for component in materialised_components)
+            )
+            self._name_list_cache.clear()
             logger.info(
                 "Компоненты чертежа для рецепта '%s' обновлены (%s штук)",
                 name,
@@ -658,67 +1217,102 @@ class Database:
             )
 
     async def get_recipe(self, name: str) -> Optional[dict[str, Any]]:
+        """Return the recipe with its components, or ``None`` if it is unknown.
+
+        Results (including misses) are cached until the recipe is written
+        through this instance; callers must not mutate the returned dict.
+        """
+
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
+        cached = self._recipe_cache.get(name)
+        if cached is not _MISSING:
+            return cached
+        generation = self._recipe_cache.generation
+        recipe_data = await self._fetch_recipe(self._reader, name)
+        self._recipe_cache.put(name, recipe_data, generation)
+        return recipe_data
+
+    async def _fetch_recipe(
+        self, conn: aiosqlite.Connection, name: str
+    ) -> Optional[dict[str, Any]]:
         logger.debug("Получаю рецепт '%s'", name)
 
-        cursor = await self._conn.execute(
+        # Components are aggregated into JSON arrays so that the recipe and both
+        # of its component lists arrive in one round trip.
+        row = await _fetchone(
+            conn,
             """
             SELECT
-                id,
-                name,
-                output_quantity,
-                is_temporary,
-                ship_type,
-                blueprint_cost,
-                creation_cost,
-                blueprint_creation_cost
-            FROM recipes
-            WHERE name = ?
+                r.id,
+                r.name,
+                r.output_quantity,
+                r.is_temporary,
+                r.ship_type,
+                r.blueprint_cost,
+                r.creation_cost,
+                r.blueprint_creation_cost,
+                (
+                    SELECT json_group_array(
+                        json_object(
+                            'resource_name', resource_name,
+                            'quantity', quantity
+                        )
+                    )
+                    FROM (
+                        SELECT resource_name, quantity
+                        FROM recipe_components
+                        WHERE recipe_id = r.id
+                        ORDER BY resource_name
+                    )
+                ) AS components_json,
+                (
+                    SELECT json_group_array(
+                        json_object(
+                            'resource_name', resource_name,
+                            'quantity', quantity
+                        )
+                    )
+                    FROM (
+                        SELECT resource_name, quantity
+                        FROM recipe_blueprint_components
+                        WHERE recipe_id = r.id
+                        ORDER BY resource_name
+                    )
+                ) AS blueprint_components_json
+            FROM recipes AS r
+            WHERE r.name = ?
             """,
             (name,),
         )
-        row = await cursor.fetchone()
-        await cursor.close()
 
         if row is None:
             logger.debug("Рецепт '%s' не найден", name)
             return None
 
-        cursor = await self._conn.execute(
-            """
-            SELECT resource_name, quantity
-            FROM recipe_components
-            WHERE recipe_id = ?
-            ORDER BY resource_name
-            """,
-            (row["id"],),
-        )
-        components = [dict(resource_name=r["resource_name"], quantity=r["quantity"]) for r in await cursor.fetchall()]
-        await cursor.close()
-        cursor = await self._conn.execute(
-            """
-            SELECT resource_name, quantity
-            FROM recipe_blueprint_components
-            WHERE recipe_id = ?
-            ORDER BY resource_name
-            """,
-            (row["id"],),
-        )
-        blueprint_components = [
-            dict(resource_name=r["resource_name"], quantity=r["quantity"])
-            for r in await cursor.fetchall()
-        ]
-        await cursor.close()
+        (
+            recipe_id,
+            recipe_name,
+            output_quantity,
+            is_temporary,
+            ship_type,
+            blueprint_cost,
+            creation_cost,
+            blueprint_creation_cost,
+            components_json,
+            blueprint_components_json,
+        ) = row
+        components = _decode_components(components_json)
+        blueprint_components = _decode_components(blueprint_components_json)
         recipe_data = {
-            "id": row["id"],
-            "name": row["name"],
-            "output_quantity": row["output_quantity"],
-            "is_temporary": bool(row["is_temporary"]),
-            "ship_type": (row["ship_type"] or None),
-            "blueprint_cost": row["blueprint_cost"],
-            "creation_cost": row["creation_cost"],
-            "blueprint_creation_cost": row["blueprint_creation_cost"],
+            "id": recipe_id,
+            "name": recipe_name,
+            "output_quantity": _from_stored(output_quantity),
+            "is_temporary": bool(is_temporary),
+            "ship_type": (ship_type or None),
+            "blueprint_cost": _from_stored_optional(blueprint_cost),
+            "creation_cost": _from_stored_optional(creation_cost),
+            "blueprint_creation_cost": _from_stored_optional(blueprint_creation_cost),
             "components": components,
             "blueprint_components": blueprint_components,
         }
@@ -730,24 +1324,64 @@ class Database:
         )
         return recipe_data
 
-    async def get_resource_unit_price(self, name: str) -> Optional[float]:
+    async def get_resource_unit_price(self, name: str) -> Optional[Decimal]:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
+        cached = self._resource_price_cache.get(name)
+        if cached is not _MISSING:
+            logger.debug("Цена ресурса '%s' взята из кеша: %s", name, cached)
+            return cached
+        generation = self._resource_price_cache.generation
         logger.debug("Запрашиваю цену ресурса '%s'", name)
 
-        cursor = await self._conn.execute(
+        row = await _fetchone(
+            self._reader,
             "SELECT unit_price FROM resources WHERE name = ?",
             (name,),
         )
-        row = await cursor.fetchone()
-        await cursor.close()
         if row is None:
             logger.info("Цена для ресурса '%s' не найдена", name)
-            return None
-        unit_price = row["unit_price"]
-        logger.info("Получена цена ресурса '%s': %s", name, unit_price)
+            unit_price = None
+        else:
+            unit_price = _from_stored(row["unit_price"])
+            logger.info("Получена цена ресурса '%s': %s", name, unit_price)
+        self._resource_price_cache.put(name, unit_price, generation)
         return unit_price
 
+    async def _search_names(
+        self, conn: aiosqlite.Connection, table: str, query: str, limit: int
+    ) -> list[str]:
+        """Return up to *limit* names from *table* containing *query*."""
+
+        key = f"{table}:{limit}:{query}"
+        cached = self._name_list_cache.get(key)
+        if cached is not _MISSING:
+            return list(cached)
+        generation = self._name_list_cache.generation
+        if query:
+            sql = f"""
+                SELECT name
+                FROM {table}
+                WHERE name LIKE ? ESCAPE '\\'
+                ORDER BY name COLLATE NOCASE
+                LIMIT ?
+            """
+            parameters: tuple[Any, ...] = (_contains_pattern(query), limit)
+        else:
+            # Autocomplete opens with an empty query; list the first names in
+            # order without going through LIKE at all.
+            sql = f"""
+                SELECT name
+                FROM {table}
+                ORDER BY name COLLATE NOCASE
+                LIMIT ?
+            """
+            parameters = (limit,)
+        rows = await _fetchall(conn, sql, parameters)
+        names = [row[0] for row in rows]
+        self._name_list_cache.put(key, tuple(names), generation)
+        return names
+
     async def search_resource_names(
         self, query: str = "", *, limit: int = 25
     ) -> list[str]:
@@ -760,7 +1394,6 @@ class Database:
             return []
 
         normalised_query = query.strip()
-        pattern = f"%{_escape_like(normalised_query)}%"
 
         logger.debug(
             "Ищу ресурсы по запросу '%s' (ограничение %s)",
@@ -768,20 +1401,9 @@ class Database:
             limit,
         )
 
-        cursor = await self._conn.execute(
-            """
-            SELECT name
-            FROM resources
-            WHERE name LIKE ? ESCAPE '\\'
-            ORDER BY name COLLATE NOCASE
-            LIMIT ?
-            """,
-            (pattern, limit),
+        names = await self._search_names(
+            self._reader, "resources", normalised_query, limit
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
-
-        names = [row["name"] for row in rows]
         logger.debug(
             "Найдено %s ресурсов по запросу '%s'", len(names), normalised_query
         )
@@ -799,7 +1421,6 @@ class Database:
             return []
 
         normalised_query = query.strip()
-        pattern = f"%{_escape_like(normalised_query)}%"
 
         logger.debug(
             "Ищу рецепты по запросу '%s' (ограничение %s)",
@@ -807,20 +1428,9 @@ class Database:
             limit,
         )
 
-        cursor = await self._conn.execute(
-            """
-            SELECT name
-            FROM recipes
-            WHERE name LIKE ? ESCAPE '\\'
-            ORDER BY name COLLATE NOCASE
-            LIMIT ?
-            """,
-            (pattern, limit),
+        names = await self._search_names(
+            self._reader, "recipes", normalised_query, limit
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
-
-        names = [row["name"] for row in rows]
         logger.debug(
             "Найдено %s рецептов по запросу '%s'", len(names), normalised_query
         )
@@ -832,17 +1442,16 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        cursor = await self._conn.execute(
+        rows = await _fetchall(
+            self._reader,
             """
             SELECT name
             FROM recipes
             ORDER BY name COLLATE NOCASE
             """
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
+        names = [row[0] for row in rows]
 
-        names = [row["name"] for row in rows]
         logger.debug("Получено %s рецептов для списка кораблей", len(names))
         return names
 
@@ -850,62 +1459,68 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        types: set[str] = set()
-
-        cursor = await self._conn.execute(
-            "SELECT type FROM ship_type_efficiencies ORDER BY type COLLATE NOCASE"
-        )
-        rows = await cursor.fetchall()
-        await cursor.close()
-        for row in rows:
-            value = (row["type"] or "").strip()
-            if value:
-                types.add(value)
-
-        cursor = await self._conn.execute(
+        cached = self._name_list_cache.get("ship_types")
+        if cached is not _MISSING:
+            return list(cached)
+        generation = self._name_list_cache.generation
+        rows = await _fetchall(
+            self._reader,
             """
-            SELECT DISTINCT ship_type
+            SELECT type FROM ship_type_efficiencies
+            UNION
+            SELECT ship_type
             FROM recipes
-            WHERE ship_type IS NOT NULL AND TRIM(ship_type) <> ''
-            """
+            WHERE ship_type IS NOT NULL
+            """,
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
-        for row in rows:
-            value = (row["ship_type"] or "").strip()
-            if value:
-                types.add(value)
+        types = {value for row in rows if (value := (row[0] or "").strip())}
 
         result = sorted(types, key=lambda item: item.lower())
         logger.debug("Найдены типы кораблей: %s", result)
+        self._name_list_cache.put("ship_types", tuple(result), generation)
         return result
 
-    async def list_ship_type_efficiencies(self) -> dict[str, Decimal]:
-        if self._conn is None:
-            raise RuntimeError("Database connection is not initialised")
+    def _invalidate_ship_type_efficiencies(self) -> None:
+        self._ship_type_efficiencies = None
+        self._ship_type_efficiencies_generation += 1
+        self._name_list_cache.clear()
+        self._recipe_cost_cache.clear()
+
+    async def _get_ship_type_efficiencies(self) -> dict[str, Decimal]:
+        """Return the cached efficiency table, loading it on first use."""
 
-        cursor = await self._conn.execute(
+        if self._ship_type_efficiencies is not None:
+            return self._ship_type_efficiencies
+        generation = self._ship_type_efficiencies_generation
+        rows = await _fetchall(
+            self._reader,
             """
             SELECT type, efficiency
             FROM ship_type_efficiencies
             ORDER BY type COLLATE NOCASE
             """
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
 
         efficiencies: dict[str, Decimal] = {}
         for row in rows:
             raw_type = (row["type"] or "").strip()
             if not raw_type:
                 continue
-            efficiencies[raw_type] = Decimal(str(row["efficiency"]))
+            efficiencies[raw_type] = _from_stored(row["efficiency"])
 
         logger.debug(
             "Получено %s настроек эффективности типов кораблей", len(efficiencies)
         )
+        if generation == self._ship_type_efficiencies_generation:
+            self._ship_type_efficiencies = efficiencies
         return efficiencies
 
+    async def list_ship_type_efficiencies(self) -> dict[str, Decimal]:
+        if self._conn is None:
+            raise RuntimeError("Database connection is not initialised")
+
+        return dict(await self._get_ship_type_efficiencies())
+
     async def set_ship_type_efficiency(
         self, ship_type: str, efficiency: Decimal
     ) -> None:
@@ -928,9 +1543,9 @@ class Database:
                 VALUES(?, ?)
                 ON CONFLICT(type) DO UPDATE SET efficiency = excluded.efficiency
                 """,
-                (normalised_type, float(efficiency)),
+                (normalised_type, _to_stored(efficiency)),
             )
-            await self._conn.commit()
+            self._invalidate_ship_type_efficiencies()
 
     async def get_ship_type_efficiency(
         self, ship_type: str
@@ -938,28 +1553,21 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        cursor = await self._conn.execute(
-            "SELECT efficiency FROM ship_type_efficiencies WHERE type = ?",
-            (ship_type.strip(),),
-        )
-        row = await cursor.fetchone()
-        await cursor.close()
-        if row is None:
-            return None
-        return Decimal(str(row["efficiency"]))
+        efficiencies = await self._get_ship_type_efficiencies()
+        return efficiencies.get(ship_type.strip())
 
     async def delete_ship_type_efficiency(self, ship_type: str) -> bool:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
         async with self._lock:
-            cursor = await self._conn.execute(
-                "DELETE FROM ship_type_efficiencies WHERE type = ?",
+            row = await _fetchone(
+                self._conn,
+                "DELETE FROM ship_type_efficiencies WHERE type = ? RETURNING type",
                 (ship_type.strip(),),
             )
-            await self._conn.commit()
-            deleted = cursor.rowcount > 0
-            await cursor.close()
+            deleted = row is not None
+            self._invalidate_ship_type_efficiencies()
             if deleted:
                 logger.info("Удалена эффективность для типа корабля '%s'", ship_type)
             else:
@@ -973,7 +1581,8 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        cursor = await self._conn.execute(
+        rows = await _fetchall(
+            self._reader,
             """
             SELECT ship_type, COUNT(*) AS recipe_count
             FROM recipes
@@ -981,8 +1590,6 @@ class Database:
             ORDER BY ship_type IS NULL, ship_type COLLATE NOCASE
             """
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
 
         stats = [
             {
@@ -1000,42 +1607,48 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
 
-        cursor = await self._conn.execute(
+        rows = await _fetchall(
+            self._reader,
             """
             SELECT name
             FROM recipes
-            WHERE ship_type IS NULL OR TRIM(ship_type) = ''
+            WHERE ship_type IS NULL
             ORDER BY name COLLATE NOCASE
             """
         )
-        rows = await cursor.fetchall()
-        await cursor.close()
         names = [row["name"] for row in rows]
         logger.debug("Найдено %s рецептов без указания типа", len(names))
         return names
 
     async def set_config_value(self, key: str, value: str) -> None:
+        await self.set_config_values({key: value})
+
+    async def set_config_values(self, values: Mapping[str, str]) -> None:
+        """Store several config entries in a single transaction."""
+
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
         async with self._lock:
-            await self._conn.execute(
-                """
-                INSERT INTO config(key, value) VALUES(?, ?)
-                ON CONFLICT(key) DO UPDATE SET value = excluded.value
-                """,
-                (key, value),
-            )
-            await self._conn.commit()
+            async with self._immediate_transaction(self._conn):
+                await self._conn.executemany(
+                    """
+                    INSERT INTO config(key, value) VALUES(?, ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                    WHERE value IS NOT excluded.value
+                    """,
+                    values.items(),
+                )
+            if GLOBAL_EFFICIENCY_CONFIG_KEY in values:
+                self._invalidate_global_efficiency()
 
     async def get_config_value(self, key: str) -> Optional[str]:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
-        cursor = await self._conn.execute(
+        row = await _fetchone(
+            self._reader,
             "SELECT value FROM config WHERE key = ?",
             (key,),
         )
-        row = await cursor.fetchone()
-        await cursor.close()
         if row is None:
             return None
         return str(row["value"])
@@ -1044,53 +1657,81 @@ class Database:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
         async with self._lock:
-            cursor = await self._conn.execute(
-                "SELECT value FROM config WHERE key = ?",
+            row = await _fetchone(
+                self._conn,
+                "DELETE FROM config WHERE key = ? RETURNING value",
                 (key,),
             )
-            row = await cursor.fetchone()
-            await cursor.close()
             if row is None:
                 return None
-            await self._conn.execute("DELETE FROM config WHERE key = ?", (key,))
-            await self._conn.commit()
+            if key == GLOBAL_EFFICIENCY_CONFIG_KEY:
+                self._invalidate_global_efficiency()
             return str(row["value"])
 
+    def _invalidate_global_efficiency(self) -> None:
+        self._global_efficiency = None
+        self._global_efficiency_generation += 1
+        self._recipe_cost_cache.clear()
+
     async def set_global_efficiency(self, efficiency: Decimal) -> None:
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
         logger.info("Устанавливаю глобальную эффективность %s", efficiency)
-        await self.set_config_value("global_efficiency", str(efficiency))
+        await self.set_config_value(GLOBAL_EFFICIENCY_CONFIG_KEY, str(efficiency))
+        self._global_efficiency = efficiency
         logger.debug("Глобальная эффективность обновлена в базе данных")
 
     async def get_global_efficiency(self) -> Decimal:
+        """Return the global efficiency, reading the config table only on a cache miss.
+
+        The parsed value is kept in memory until the ``global_efficiency`` key is
+        written through :meth:`set_config_value` / :meth:`pop_config_value` or the
+        connection is reopened.
+        """
+
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
+        if self._global_efficiency is not None:
+            return self._global_efficiency
         logger.debug("Получаю значение глобальной эффективности")
-        value_raw = await self.get_config_value("global_efficiency")
+        generation = self._global_efficiency_generation
+        value_raw = await self.get_config_value(GLOBAL_EFFICIENCY_CONFIG_KEY)
         if value_raw is None:
             logger.warning(
                 "Значение глобальной эффективности отсутствует в таблице config, используется значение по умолчанию"
             )
-            return Decimal("100")
+            return DEFAULT_GLOBAL_EFFICIENCY
         try:
             value = Decimal(value_raw)
-            logger.debug("Получено значение глобальной эффективности %s", value)
-            return value
         except (InvalidOperation, TypeError):
             logger.error(
                 "Не удалось преобразовать значение глобальной эффективности '%s', используется значение по умолчанию",
                 value_raw,
             )
-            return Decimal("100")
+            return DEFAULT_GLOBAL_EFFICIENCY
+        logger.debug("Получено значение глобальной эффективности %s", value)
+        if generation == self._global_efficiency_generation:
+            self._global_efficiency = value
+        return value
 
     async def calculate_recipe_cost(
         self,
         recipe_name: str,
         efficiency: Optional[Decimal] = None,
     ) -> dict[str, Any]:
+        """Return the cost breakdown of *recipe_name*.
+
+        Results are cached until a recipe, price or efficiency is written
+        through this instance; callers must not mutate the returned dict.
+        """
+
         if self._conn is None:
             raise RuntimeError("Database connection is not initialised")
+        cache_key = f"{recipe_name}:{efficiency}"
+        cached = self._recipe_cost_cache.get(cache_key)
+        if cached is not _MISSING:
+            return cached
+        generation = self._recipe_cost_cache.generation
 
         base_recipe = await self.get_recipe(recipe_name)
         if base_recipe is None:
@@ -1118,7 +1759,22 @@ class Database:
             "Рассчитываю стоимость рецепта '%s' с эффективностью %s", recipe_name, efficiency
         )
 
-        async def resource_cost(
+        recipes, prices = await _load_recipe_graph(
+            self._reader,
+            [recipe_name]
+            + [
+                component["resource_name"]
+                for component in base_recipe.get("blueprint_components") or []
+            ],
+        )
+        # A resource's unit cost only depends on the multiplier in effect, so it
+        # is computed once even when several recipes share it.
+        unit_costs: dict[
+            tuple[str, Decimal], tuple[Decimal, dict[str, tuple[Decimal, Decimal]]]
+        ] = {}
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        def resource_cost(
             resource_name: str,
             visiting: set[str],
             quantity_multiplier: Decimal,
@@ -1127,20 +1783,24 @@ class Database:
                 raise CircularRecipeReferenceError(
                     f"Circular reference detected for resource '{resource_name}'"
                 )
-            nested_recipe = await self.get_recipe(resource_name)
+            known = unit_costs.get((resource_name, quantity_multiplier))
+            if known is not None:
+                return known
+            nested_recipe = recipes.get(resource_name)
             if nested_recipe is not None:
-                logger.debug(
-                    "Ресурс '%s' является рецептом, рассчитываю стоимость вложенного рецепта",
-                    resource_name,
-                )
+                if debug:
+                    logger.debug(
+                        "Ресурс '%s' является рецептом, рассчитываю стоимость вложенного рецепта",
+                        resource_name,
+                    )
                 visiting.add(resource_name)
-                cost_per_run, nested_breakdown = await recipe_cost(
+                cost_per_run, nested_breakdown = recipe_cost(
                     nested_recipe,
                     visiting,
                     quantity_multiplier,
                 )
                 visiting.remove(resource_name)
-                output_quantity = Decimal(str(nested_recipe["output_quantity"]))
+                output_quantity = nested_recipe["output_quantity"]
                 if output_quantity <= 0:
                     raise ValueError(
                         f"Recipe '{resource_name}' must have positive output quantity"
@@ -1150,105 +1810,95 @@ class Database:
                     base_name: (quantity / output_quantity, unit_price)
                     for base_name, (quantity, unit_price) in nested_breakdown.items()
                 }
-                return unit_cost, aggregated_per_unit
-
-            price = await self.get_resource_unit_price(resource_name)
-            if price is None:
-                raise ResourcePriceNotFoundError(
-                    f"No price registered for resource '{resource_name}'"
-                )
-            logger.debug(
-                "Используется сохранённая цена ресурса '%s': %s",
-                resource_name,
-                price,
-            )
-            unit_price = Decimal(str(price))
-            return unit_price, {resource_name: (Decimal("1"), unit_price)}
+                result = unit_cost, aggregated_per_unit
+            else:
+                price = prices.get(resource_name)
+                if price is None:
+                    raise ResourcePriceNotFoundError(
+                        f"No price registered for resource '{resource_name}'"
+                    )
+                if debug:
+                    logger.debug(
+                        "Используется сохранённая цена ресурса '%s': %s",
+                        resource_name,
+                        price,
+                    )
+                result = price, {resource_name: (Decimal("1"), price)}
+            unit_costs[(resource_name, quantity_multiplier)] = result
+            return result
 
-        async def recipe_cost(
+        def recipe_cost(
             recipe: dict[str, Any],
             visiting: set[str],
             quantity_multiplier: Decimal,
-        ) -> tuple[Decimal, dict[str, tuple[Decimal, Decimal]]]:
-            logger.debug(
-                "Начинаю расчёт стоимости рецепта '%s' для %s компонентов",
-                recipe["name"],
-                len(recipe["components"]),
-            )
+        ) -> tuple[Decimal, dict[str, list[Decimal]]]:
+            if debug:
+                logger.debug(
+                    "Начинаю расчёт стоимости рецепта '%s' для %s компонентов",
+                    recipe["name"],
+                    len(recipe["components"]),
+                )
             total = Decimal("0")
-            breakdown: dict[str, tuple[Decimal, Decimal]] = {}
+            # Mutable [quantity, unit_price] cells let repeated resources be
+            # accumulated in place.
+            breakdown: dict[str, list[Decimal]] = {}
             for component in recipe["components"]:
-                component_quantity = (
-                    Decimal(str(component["quantity"])) * quantity_multiplier
-                )
-                (
-                    component_cost,
-                    component_breakdown,
-                ) = await resource_cost(
+                component_cost, component_breakdown = resource_cost(
                     component["resource_name"],
                     visiting,
                     quantity_multiplier,
                 )
+                component_quantity = component["quantity"] * quantity_multiplier
                 total_cost = component_quantity * component_cost
                 total += total_cost
-                logger.debug(
-                    "Компонент '%s': количество=%s, цена=%s, промежуточная сумма=%s",
-                    component["resource_name"],
-                    component_quantity,
-                    component_cost,
-                    total,
-                )
+                if debug:
+                    logger.debug(
+                        "Компонент '%s': количество=%s, цена=%s, промежуточная сумма=%s",
+                        component["resource_name"],
+                        component_quantity,
+                        component_cost,
+                        total,
+                    )
                 for base_name, (quantity_per_unit, unit_price) in component_breakdown.items():
                     total_quantity = quantity_per_unit * component_quantity
-                    if base_name in breakdown:
-                        current_quantity, _ = breakdown[base_name]
-                        breakdown[base_name] = (
-                            current_quantity + total_quantity,
-                            unit_price,
-                        )
+                    cell = breakdown.get(base_name)
+                    if cell is None:
+                        breakdown[base_name] = [total_quantity, unit_price]
                     else:
-                        breakdown[base_name] = (total_quantity, unit_price)
+                        cell[0] += total_quantity
+                        cell[1] = unit_price
             return total, breakdown
 
-        total_run_cost, aggregated_breakdown = await recipe_cost(
+        total_run_cost, aggregated_breakdown = recipe_cost(
             base_recipe,
             {recipe_name},
             multiplier,
         )
-        output_quantity = Decimal(str(base_recipe["output_quantity"]))
+        output_quantity = base_recipe["output_quantity"]
+        if output_quantity <= 0:
+            raise ValueError(
+                f"Recipe '{recipe_name}' must have positive output quantity"
+            )
         unit_cost = total_run_cost / output_quantity
         blueprint_components_data = base_recipe.get("blueprint_components") or []
         blueprint_components_cost = Decimal("0")
-        blueprint_aggregated_breakdown: dict[str, tuple[Decimal, Decimal]] = {}
+        blueprint_aggregated_breakdown: dict[str, list[Decimal]] = {}
         if blueprint_components_data:
             blueprint_recipe = {
                 "name": f"{recipe_name} (чертеж)",
                 "components": blueprint_components_data,
                 "output_quantity": Decimal("1"),
             }
-            blueprint_components_cost, blueprint_aggregated_breakdown = await recipe_cost(
+            blueprint_components_cost, blueprint_aggregated_breakdown = recipe_cost(
                 blueprint_recipe,
                 {recipe_name},
                 Decimal("1"),
             )
-        raw_blueprint_cost = base_recipe.get("blueprint_cost")
-        raw_creation_cost = base_recipe.get("creation_cost")
-        raw_blueprint_creation_cost = base_recipe.get("blueprint_creation_cost")
-        blueprint_cost: Optional[Decimal]
-        creation_cost: Optional[Decimal]
-        blueprint_creation_cost: Optional[Decimal]
-        if raw_blueprint_cost is None:
-            blueprint_cost = None
-        else:
-            blueprint_cost = Decimal(str(raw_blueprint_cost))
-        if raw_creation_cost is None:
-            creation_cost = None
-        else:
-            creation_cost = Decimal(str(raw_creation_cost))
-        if raw_blueprint_creation_cost is None:
-            blueprint_creation_cost = None
-        else:
-            blueprint_creation_cost = Decimal(str(raw_blueprint_creation_cost))
+        blueprint_cost: Optional[Decimal] = base_recipe.get("blueprint_cost")
+        creation_cost: Optional[Decimal] = base_recipe.get("creation_cost")
+        blueprint_creation_cost: Optional[Decimal] = base_recipe.get(
+            "blueprint_creation_cost"
+        )
         total_with_additions = total_run_cost + blueprint_components_cost
         if blueprint_cost is not None:
             total_with_additions += blueprint_cost
@@ -1256,10 +1906,7 @@ class Database:
             total_with_additions += creation_cost
         if blueprint_creation_cost is not None:
             total_with_additions += blueprint_creation_cost
-        if output_quantity > 0:
-            unit_cost_with_additions = total_with_additions / output_quantity
-        else:
-            unit_cost_with_additions = total_with_additions
+        unit_cost_with_additions = total_with_additions / output_quantity
         logger.info(
             "Стоимость рецепта '%s': цикл=%s, единица=%s", recipe_name, total_run_cost, unit_cost
         )
@@ -1271,27 +1918,11 @@ class Database:
             total_run_cost,
             unit_cost,
         )
-        components_breakdown = [
-            {
-                "resource_name": name,
-                "quantity": quantity,
-                "unit_cost": unit_price,
-                "total_cost": unit_price * quantity,
-            }
-            for name, (quantity, unit_price) in sorted(aggregated_breakdown.items())
-        ]
-        blueprint_components_breakdown = [
-            {
-                "resource_name": name,
-                "quantity": quantity,
-                "unit_cost": unit_price,
-                "total_cost": unit_price * quantity,
-            }
-            for name, (quantity, unit_price) in sorted(
-                blueprint_aggregated_breakdown.items()
-            )
-        ]
-        return {
+        components_breakdown = _breakdown_rows(aggregated_breakdown)
+        blueprint_components_breakdown = _breakdown_rows(
+            blueprint_aggregated_breakdown
+        )
+        result = {
             "efficiency": efficiency,
             "run_cost": total_run_cost,
             "unit_cost": unit_cost,
@@ -1307,6 +1938,25 @@ class Database:
             "blueprint_components": blueprint_components_breakdown,
             "blueprint_components_cost": blueprint_components_cost,
         }
+        self._recipe_cost_cache.put(cache_key, result, generation)
+        return result
+
+
+def _breakdown_rows(breakdown: Mapping[str, list[Decimal]]) -> list[dict[str, Any]]:
+    """Turn an aggregated breakdown into rows ordered by resource name."""
+
+    rows = []
+    for name in sorted(breakdown):
+        quantity, unit_price = breakdown[name]
+        rows.append(
+            {
+                "resource_name": name,
+                "quantity": quantity,
+                "unit_cost": unit_price,
+                "total_cost": unit_price * quantity,
+            }
+        )
+    return rows
 
 
 THOUSAND_SEPARATORS = {
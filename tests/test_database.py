@@ -0,0 +1,473 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from decimal import Decimal
+
+from database import (
+    CURRENT_SCHEMA_VERSION,
+    CircularRecipeReferenceError,
+    Database,
+    RecipeComponent,
+    _escape_like,
+)
+
+
+class EscapeLikeTests(unittest.TestCase):
+    def test_escape_like_escapes_wildcards_and_escape_character(self) -> None:
+        self.assertEqual(_escape_like("50%_a\\b"), "50\\%\\_a\\\\b")
+
+
+class DatabaseTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.database = Database(os.path.join(self._tmpdir.name, "zavod.db"))
+        await self.database.connect()
+
+    async def asyncTearDown(self) -> None:
+        await self.database.close()
+        self._tmpdir.cleanup()
+
+
+class GlobalEfficiencyCacheTests(DatabaseTestCase):
+    async def test_set_config_value_invalidates_cached_efficiency(self) -> None:
+        self.assertEqual(await self.database.get_global_efficiency(), Decimal("100"))
+        await self.database.set_config_value("global_efficiency", "85")
+        self.assertEqual(await self.database.get_global_efficiency(), Decimal("85"))
+
+    async def test_set_global_efficiency_survives_reconnect(self) -> None:
+        await self.database.set_global_efficiency(Decimal("92.5"))
+        self.assertEqual(await self.database.get_global_efficiency(), Decimal("92.5"))
+        await self.database.close()
+        await self.database.connect()
+        self.assertEqual(await self.database.get_global_efficiency(), Decimal("92.5"))
+
+    async def test_read_overlapping_a_write_does_not_cache_stale_value(self) -> None:
+        read_config_value = self.database.get_config_value
+
+        async def read_then_write(key: str):
+            value = await read_config_value(key)
+            await self.database.set_global_efficiency(Decimal("85"))
+            return value
+
+        with mock.patch.object(self.database, "get_config_value", read_then_write):
+            self.assertEqual(
+                await self.database.get_global_efficiency(), Decimal("100")
+            )
+        self.assertEqual(await self.database.get_global_efficiency(), Decimal("85"))
+
+
+class ShipTypeEfficiencyCacheTests(DatabaseTestCase):
+    async def test_ship_type_efficiency_writes_invalidate_cached_table(self) -> None:
+        self.assertIsNone(await self.database.get_ship_type_efficiency("Frigate"))
+        await self.database.set_ship_type_efficiency("Frigate", Decimal("92.5"))
+        self.assertEqual(
+            await self.database.get_ship_type_efficiency(" Frigate "), Decimal("92.5")
+        )
+        self.assertTrue(await self.database.delete_ship_type_efficiency("Frigate"))
+        self.assertEqual(await self.database.list_ship_type_efficiencies(), {})
+
+    async def test_recipe_cost_uses_updated_ship_type_efficiency(self) -> None:
+        await self.database.add_recipe(
+            "Rifter",
+            Decimal("1"),
+            [RecipeComponent("Tritanium", Decimal("10"), Decimal("2"))],
+            ship_type="Frigate",
+        )
+        result = await self.database.calculate_recipe_cost("Rifter")
+        self.assertEqual(result["efficiency"], Decimal("100"))
+        self.assertEqual(result["run_cost"], Decimal("20"))
+
+        await self.database.set_ship_type_efficiency("Frigate", Decimal("50"))
+        result = await self.database.calculate_recipe_cost("Rifter")
+        self.assertEqual(result["efficiency"], Decimal("50"))
+        self.assertEqual(result["run_cost"], Decimal("10"))
+
+
+class GetRecipeTests(DatabaseTestCase):
+    async def test_get_recipe_returns_sorted_components_with_exact_quantities(
+        self,
+    ) -> None:
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [
+                RecipeComponent("Pyerite", Decimal("0.1"), Decimal("3.1234567")),
+                RecipeComponent("Isogen", Decimal("12"), Decimal("7")),
+            ],
+        )
+        await self.database.set_recipe_blueprint_components(
+            "Frigate", [RecipeComponent("Mexallon", Decimal("5"), Decimal("2"))]
+        )
+
+        recipe = await self.database.get_recipe("Frigate")
+
+        self.assertIsNotNone(recipe)
+        self.assertEqual(
+            recipe["components"],
+            [
+                {"resource_name": "Isogen", "quantity": Decimal("12")},
+                {"resource_name": "Pyerite", "quantity": Decimal("0.1")},
+            ],
+        )
+        self.assertEqual(
+            recipe["blueprint_components"],
+            [{"resource_name": "Mexallon", "quantity": Decimal("5")}],
+        )
+        self.assertEqual(recipe["output_quantity"], Decimal("1"))
+        self.assertEqual(
+            await self.database.get_resource_unit_price("Pyerite"),
+            Decimal("3.123457"),
+        )
+        self.assertIsNone(await self.database.get_recipe("Cruiser"))
+
+    async def test_resaving_recipe_replaces_changed_components(self) -> None:
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [
+                RecipeComponent("Tritanium", Decimal("10"), Decimal("1")),
+                RecipeComponent("Pyerite", Decimal("4"), Decimal("2")),
+                RecipeComponent("Pyerite", Decimal("4"), Decimal("2")),
+            ],
+        )
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [
+                RecipeComponent("Pyerite", Decimal("4"), Decimal("3")),
+                RecipeComponent("Isogen", Decimal("2"), Decimal("5")),
+                RecipeComponent("Tritanium", Decimal("12"), Decimal("1")),
+            ],
+        )
+
+        recipe = await self.database.get_recipe("Frigate")
+        self.assertEqual(
+            recipe["components"],
+            [
+                {"resource_name": "Isogen", "quantity": Decimal("2")},
+                {"resource_name": "Pyerite", "quantity": Decimal("4")},
+                {"resource_name": "Tritanium", "quantity": Decimal("12")},
+            ],
+        )
+        self.assertEqual(
+            await self.database.get_resource_unit_price("Pyerite"), Decimal("3")
+        )
+
+    async def test_values_outside_the_stored_range_are_rejected(self) -> None:
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [RecipeComponent("Tritanium", Decimal("1"), Decimal("1"))],
+        )
+
+        with self.assertRaises(ValueError):
+            await self.database.set_recipe_blueprint_cost("Frigate", Decimal("1e13"))
+        with self.assertRaises(ValueError):
+            await self.database.set_recipe_blueprint_cost("Frigate", Decimal("NaN"))
+        recipe = await self.database.get_recipe("Frigate")
+        self.assertIsNone(recipe["blueprint_cost"])
+
+    async def test_values_that_round_to_zero_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            await self.database.add_recipe(
+                "Frigate",
+                Decimal("0.0000001"),
+                [RecipeComponent("Tritanium", Decimal("1"), Decimal("1"))],
+            )
+        self.assertIsNone(await self.database.get_recipe("Frigate"))
+
+
+class SearchNamesTests(DatabaseTestCase):
+    async def test_search_resource_names_handles_empty_and_wildcard_queries(
+        self,
+    ) -> None:
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [
+                RecipeComponent("tritanium", Decimal("1"), Decimal("1")),
+                RecipeComponent("Iso_gen", Decimal("1"), Decimal("1")),
+                RecipeComponent("Pyerite", Decimal("1"), Decimal("1")),
+            ],
+        )
+
+        self.assertEqual(
+            await self.database.search_resource_names("", limit=2),
+            ["Iso_gen", "Pyerite"],
+        )
+        self.assertEqual(await self.database.search_resource_names("_"), ["Iso_gen"])
+
+
+class CalculateRecipeCostTests(DatabaseTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        await self.database.add_recipe(
+            "Plate",
+            Decimal("2"),
+            [
+                RecipeComponent("Tritanium", Decimal("10"), Decimal("1.5")),
+                RecipeComponent("Pyerite", Decimal("4"), Decimal("3")),
+            ],
+        )
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [
+                RecipeComponent("Plate", Decimal("2"), Decimal("0")),
+                RecipeComponent("Tritanium", Decimal("5"), Decimal("1.5")),
+            ],
+        )
+
+    async def test_nested_recipes_are_expanded_into_base_resources(self) -> None:
+        result = await self.database.calculate_recipe_cost(
+            "Frigate", Decimal("100")
+        )
+
+        self.assertEqual(result["run_cost"], Decimal("34.5"))
+        self.assertEqual(
+            [
+                (item["resource_name"], item["quantity"])
+                for item in result["components"]
+            ],
+            [("Pyerite", Decimal("4")), ("Tritanium", Decimal("15"))],
+        )
+
+    async def test_circular_recipes_are_reported(self) -> None:
+        await self.database.add_recipe(
+            "Plate",
+            Decimal("2"),
+            [RecipeComponent("Frigate", Decimal("1"), Decimal("0"))],
+        )
+
+        with self.assertRaises(CircularRecipeReferenceError):
+            await self.database.calculate_recipe_cost("Frigate")
+
+    async def test_non_positive_output_quantity_is_reported(self) -> None:
+        await self.database.add_recipe(
+            "Cruiser",
+            Decimal("0"),
+            [RecipeComponent("Tritanium", Decimal("5"), Decimal("1.5"))],
+        )
+        await self.database.set_recipe_blueprint_components(
+            "Cruiser", [RecipeComponent("Pyerite", Decimal("1"), Decimal("3"))]
+        )
+
+        with self.assertRaises(ValueError):
+            await self.database.calculate_recipe_cost("Cruiser")
+
+    async def test_results_are_cached_until_a_nested_recipe_changes(self) -> None:
+        first = await self.database.calculate_recipe_cost("Frigate", Decimal("100"))
+        self.assertIs(
+            await self.database.calculate_recipe_cost("Frigate", Decimal("100")), first
+        )
+
+        await self.database.add_recipe(
+            "Plate",
+            Decimal("2"),
+            [RecipeComponent("Tritanium", Decimal("10"), Decimal("1.5"))],
+        )
+
+        updated = await self.database.calculate_recipe_cost("Frigate", Decimal("100"))
+        self.assertEqual(updated["run_cost"], Decimal("22.5"))
+
+
+class LookupCacheTests(DatabaseTestCase):
+    async def test_writes_invalidate_cached_lookups(self) -> None:
+        self.assertIsNone(await self.database.get_resource_unit_price("Tritanium"))
+        self.assertIsNone(await self.database.get_recipe("Frigate"))
+
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [RecipeComponent("Tritanium", Decimal("10"), Decimal("4"))],
+        )
+        self.assertEqual(
+            await self.database.get_resource_unit_price("Tritanium"), Decimal("4")
+        )
+        self.assertIsNotNone(await self.database.get_recipe("Frigate"))
+
+        await self.database.delete_recipe("Frigate")
+        self.assertIsNone(await self.database.get_recipe("Frigate"))
+
+    async def test_writes_invalidate_cached_name_lists(self) -> None:
+        self.assertEqual(await self.database.search_recipe_names("fri"), [])
+        self.assertEqual(await self.database.get_known_ship_types(), [])
+
+        await self.database.add_recipe(
+            "Frigate",
+            Decimal("1"),
+            [RecipeComponent("Tritanium", Decimal("10"), Decimal("4"))],
+            ship_type="Assault",
+        )
+        self.assertEqual(await self.database.search_recipe_names("fri"), ["Frigate"])
+        self.assertEqual(
+            await self.database.search_resource_names("trit"), ["Tritanium"]
+        )
+        self.assertEqual(await self.database.get_known_ship_types(), ["Assault"])
+
+        await self.database.set_ship_type_efficiency("Cruiser", Decimal("90"))
+        self.assertEqual(
+            await self.database.get_known_ship_types(), ["Assault", "Cruiser"]
+        )
+
+        await self.database.delete_recipe("Frigate")
+        self.assertEqual(await self.database.search_recipe_names("fri"), [])
+
+
+LEGACY_V6_SCHEMA = """
+CREATE TABLE resources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    unit_price REAL NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    output_quantity REAL NOT NULL DEFAULT 1,
+    is_temporary INTEGER NOT NULL DEFAULT 0,
+    ship_type TEXT,
+    blueprint_cost REAL,
+    creation_cost REAL,
+    blueprint_creation_cost REAL
+);
+CREATE TABLE recipe_components (
+    recipe_id INTEGER NOT NULL,
+    resource_name TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+);
+CREATE TABLE recipe_blueprint_components (
+    recipe_id INTEGER NOT NULL,
+    resource_name TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+);
+CREATE TABLE config (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE ship_type_efficiencies (type TEXT PRIMARY KEY, efficiency REAL NOT NULL);
+INSERT INTO config(key, value) VALUES ('schema_version', '6');
+INSERT INTO resources(name, unit_price) VALUES ('Tritanium', 3.5714285714), ('Mexallon', 11.25);
+INSERT INTO recipes(name, output_quantity, ship_type, blueprint_cost)
+    VALUES ('Frigate', 2, '  ', 123456789.12);
+INSERT INTO recipe_components(recipe_id, resource_name, quantity) VALUES (1, 'Tritanium', 0.1);
+INSERT INTO recipe_blueprint_components(recipe_id, resource_name, quantity)
+    VALUES (1, 'Mexallon', 1.5);
+INSERT INTO ship_type_efficiencies(type, efficiency) VALUES ('Cruiser', 92.5);
+"""
+
+
+def _table_info(path: str, table: str) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    try:
+        return [
+            tuple(row[1:])
+            for row in conn.execute(f"PRAGMA table_info({table})")
+        ]
+    finally:
+        conn.close()
+
+
+class MigrationTests(DatabaseTestCase):
+    async def test_legacy_real_columns_are_migrated_to_micro_units(self) -> None:
+        legacy_path = os.path.join(self._tmpdir.name, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.executescript(LEGACY_V6_SCHEMA)
+        conn.close()
+
+        legacy = Database(legacy_path)
+        await legacy.connect()
+        try:
+            self.assertEqual(await legacy.get_schema_version(), CURRENT_SCHEMA_VERSION)
+            recipe = await legacy.get_recipe("Frigate")
+            self.assertEqual(recipe["output_quantity"], Decimal("2"))
+            self.assertEqual(recipe["blueprint_cost"], Decimal("123456789.12"))
+            self.assertIsNone(recipe["ship_type"])
+            self.assertEqual(
+                recipe["components"],
+                [{"resource_name": "Tritanium", "quantity": Decimal("0.1")}],
+            )
+            self.assertEqual(
+                recipe["blueprint_components"],
+                [{"resource_name": "Mexallon", "quantity": Decimal("1.5")}],
+            )
+            self.assertEqual(
+                await legacy.get_resource_unit_price("Tritanium"),
+                Decimal("3.571429"),
+            )
+            self.assertEqual(
+                await legacy.get_ship_type_efficiency("Cruiser"), Decimal("92.5")
+            )
+        finally:
+            await legacy.close()
+
+        fresh_path = self.database.path
+        for table in (
+            "resources",
+            "recipe_components",
+            "recipe_blueprint_components",
+            "ship_type_efficiencies",
+        ):
+            self.assertEqual(
+                _table_info(legacy_path, table), _table_info(fresh_path, table)
+            )
+        self.assertCountEqual(
+            _table_info(legacy_path, "recipes"), _table_info(fresh_path, "recipes")
+        )
+
+    async def test_database_without_ship_type_column_is_upgraded(self) -> None:
+        legacy_path = os.path.join(self._tmpdir.name, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.executescript(
+            """
+            CREATE TABLE recipes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                output_quantity REAL NOT NULL DEFAULT 1
+            );
+            INSERT INTO recipes(name) VALUES ('Frigate');
+            """
+        )
+        conn.close()
+
+        legacy = Database(legacy_path)
+        await legacy.connect()
+        try:
+            self.assertEqual(await legacy.get_schema_version(), CURRENT_SCHEMA_VERSION)
+            self.assertEqual(await legacy.get_recipes_without_type(), ["Frigate"])
+        finally:
+            await legacy.close()
+
+        conn = sqlite3.connect(legacy_path)
+        try:
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+        finally:
+            conn.close()
+        self.assertIn("idx_recipes_ship_type", indexes)
+
+    async def test_reconnect_skips_schema_check_once_version_is_recorded(
+        self,
+    ) -> None:
+        conn = sqlite3.connect(self.database.path)
+        try:
+            (user_version,) = conn.execute("PRAGMA user_version").fetchone()
+        finally:
+            conn.close()
+        self.assertEqual(user_version, CURRENT_SCHEMA_VERSION)
+
+        await self.database.close()
+        with self.assertLogs("database", level="DEBUG") as logs:
+            await self.database.connect()
+        self.assertFalse(
+            any("Проверяю схему" in message for message in logs.output)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import math
 import os
 from decimal import Decimal
 from typing import Awaitable, Callable, Optional
@@ -12,7 +15,6 @@ from database import (
     CircularRecipeReferenceError,
     RecipeNotFoundError,
     ResourcePriceNotFoundError,
-    parse_decimal,
 )
 
 from .config import LAST_COMMAND_CHANNEL_CONFIG_KEY, RECIPE_FEED_CHANNEL_ID, STATUS_CHANNEL_ENV
@@ -96,23 +98,34 @@ async def info_command(interaction: discord.Interaction) -> None:
         await interaction.followup.send(chunk, ephemeral=True)
 
 
+@functools.lru_cache(maxsize=256)
 def _format_decimal(value: Decimal) -> str:
-    text = format(value.normalize(), "f")
-    if "." in text:
-        text = text.rstrip("0").rstrip(".")
+    if value.is_finite() and value == value.to_integral_value():
+        return str(int(value))
+    normalised = value.normalize()
+    text = str(normalised)
+    if "E" in text:
+        text = format(normalised, "f")
     return text
 
 
+def _float_to_decimal(value: float) -> Decimal:
+    if not math.isfinite(value):
+        raise ValueError(f"Cannot convert non-finite value {value!r} to Decimal")
+    return Decimal(repr(value))
+
+
 def _match_ship_types(types: list[str], current: str) -> list[app_commands.Choice[str]]:
     search = current.strip().lower()
     if not search:
         filtered = types[:25]
     else:
-        filtered = [
-            value
-            for value in types
-            if search in value.lower()
-        ][:25]
+        filtered = []
+        for value in types:
+            if search in value.lower():
+                filtered.append(value)
+                if len(filtered) == 25:
+                    break
     return [app_commands.Choice(name=value, value=value) for value in filtered]
 
 
@@ -131,16 +144,12 @@ def _format_resource_lines(
 ) -> list[str]:
     if not components:
         return [title, " • Не указаны (не учтены)"]
-    return [
-        title,
-        *[
-            " • {name}: {quantity}".format(
-                name=component["resource_name"],
-                quantity=format(component["quantity"], ","),
-            )
-            for component in components
-        ],
-    ]
+    lines = [title]
+    lines.extend(
+        f" • {component['resource_name']}: {component['quantity']:,}"
+        for component in components
+    )
+    return lines
 
 
 def _format_efficiency_line(
@@ -166,6 +175,16 @@ async def _read_table_input(
     return None
 
 
+async def _recipe_name_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[str]]:
+    """Автодополнение названий рецептов."""
+
+    del interaction
+    recipe_names = await database.search_recipe_names(current)
+    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+
+
 @bot.tree.command(name="add_recipe", description="Добавить или обновить рецепт")
 @app_commands.checks.has_permissions(manage_guild=True)
 @app_commands.describe(
@@ -207,6 +226,7 @@ async def add_recipe_command(
         )
         return
 
+    quantity = Decimal(output_quantity)
     await interaction.response.defer(thinking=True)
 
     async def notify_missing_table() -> None:
@@ -223,7 +243,7 @@ async def add_recipe_command(
         components = parse_recipe_table(table_text)
         await database.add_recipe(
             name=recipe_name,
-            output_quantity=Decimal(output_quantity),
+            output_quantity=quantity,
             components=components,
             is_temporary=True,
             ship_type=normalised_ship_type,
@@ -240,26 +260,28 @@ async def add_recipe_command(
         )
         return
 
+    component_count = len(components)
     logger.info(
-        "Рецепт '%s' успешно сохранён, обновлено %s ресурсов", recipe_name, len(components)
+        "Рецепт '%s' успешно сохранён, обновлено %s ресурсов", recipe_name, component_count
     )
-    await interaction.followup.send(
-        "\n".join(
-            [
-                f"Рецепт '{recipe_name}' сохранён как временный.",
-                "Обновлены цены {count} ресурсов.".format(count=len(components)),
-                "Подтверждение доступно в канале <#{RECIPE_FEED_CHANNEL_ID}>.",
-            ]
+    await asyncio.gather(
+        interaction.followup.send(
+            "\n".join(
+                [
+                    f"Рецепт '{recipe_name}' сохранён как временный.",
+                    "Обновлены цены {count} ресурсов.".format(count=component_count),
+                    "Подтверждение доступно в канале <#{RECIPE_FEED_CHANNEL_ID}>.",
+                ]
+            ),
+            ephemeral=False,
+        ),
+        notify_recipe_added(
+            recipe_name,
+            output_quantity=quantity,
+            component_count=component_count,
+            is_temporary=True,
+            ship_type=normalised_ship_type,
         ),
-        ephemeral=False,
-    )
-
-    await notify_recipe_added(
-        recipe_name,
-        output_quantity=Decimal(output_quantity),
-        component_count=len(components),
-        is_temporary=True,
-        ship_type=normalised_ship_type,
     )
 
 
@@ -295,28 +317,29 @@ async def recipe_price_command(
         efficiency_decimal = None
     else:
         try:
-            efficiency_decimal = parse_decimal(str(efficiency))
+            efficiency_decimal = _float_to_decimal(efficiency)
         except ValueError:
             await interaction.response.send_message(
                 "Эффективность должна быть числом", ephemeral=False
             )
             return
 
+    await interaction.response.defer(thinking=True)
     try:
         result = await database.calculate_recipe_cost(recipe_name, efficiency_decimal)
     except RecipeNotFoundError:
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"Рецепт '{recipe_name}' не найден", ephemeral=False
         )
         return
     except ResourcePriceNotFoundError as exc:
-        await interaction.response.send_message(str(exc), ephemeral=False)
+        await interaction.followup.send(str(exc), ephemeral=False)
         return
     except CircularRecipeReferenceError as exc:
-        await interaction.response.send_message(str(exc), ephemeral=False)
+        await interaction.followup.send(str(exc), ephemeral=False)
         return
     except ValueError as exc:
-        await interaction.response.send_message(str(exc), ephemeral=False)
+        await interaction.followup.send(str(exc), ephemeral=False)
         return
 
     effective_efficiency = result["efficiency"]
@@ -412,20 +435,10 @@ async def recipe_price_command(
                 )
             )
 
-    await interaction.response.send_message(
-        "\n".join(summary_lines)
-    )
-
+    await interaction.followup.send("\n".join(summary_lines))
 
-@recipe_price_command.autocomplete("recipe_name")
-async def recipe_price_autocomplete(
-    interaction: discord.Interaction, current: str
-) -> list[app_commands.Choice[str]]:
-    """Автодополнение названий рецептов для команды расчёта цены."""
 
-    del interaction
-    recipe_names = await database.search_recipe_names(current)
-    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+recipe_price_command.autocomplete("recipe_name")(_recipe_name_autocomplete)
 
 
 @bot.tree.command(name="resource_price", description="Показать цену ресурса")
@@ -531,37 +544,26 @@ async def set_blueprint_components_command(
     )
 
 
-@set_blueprint_components_command.autocomplete("recipe_name")
-async def set_blueprint_components_autocomplete(
-    interaction: discord.Interaction, current: str
-) -> list[app_commands.Choice[str]]:
-    del interaction
-    recipe_names = await database.search_recipe_names(current)
-    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+set_blueprint_components_command.autocomplete("recipe_name")(_recipe_name_autocomplete)
 
 
-@bot.tree.command(
-    name="set_recipe_blueprint_cost",
-    description="Установить стоимость чертежа рецепта",
-)
-@app_commands.checks.has_permissions(manage_guild=True)
-@app_commands.describe(
-    recipe_name="Название рецепта",
-    value="Стоимость чертежа",
-)
-async def set_recipe_blueprint_cost_command(
+async def _set_recipe_cost(
     interaction: discord.Interaction,
+    command_name: str,
     recipe_name: str,
     value: float,
+    setter: Callable[[str, Decimal], Awaitable[None]],
+    success_template: str,
 ) -> None:
     logger.info(
-        "Получена команда set_recipe_blueprint_cost: пользователь=%s, рецепт=%s, стоимость=%s",
+        "Получена команда %s: пользователь=%s, рецепт=%s, стоимость=%s",
+        command_name,
         interaction.user,
         recipe_name,
         value,
     )
     try:
-        cost = parse_decimal(str(value))
+        cost = _float_to_decimal(value)
     except ValueError:
         await interaction.response.send_message(
             "Стоимость должна быть числом",
@@ -575,29 +577,47 @@ async def set_recipe_blueprint_cost_command(
         )
         return
     try:
-        await database.set_recipe_blueprint_cost(recipe_name, cost)
+        await setter(recipe_name, cost)
     except RecipeNotFoundError:
         await interaction.response.send_message(
             f"Рецепт '{recipe_name}' не найден",
             ephemeral=False,
         )
         return
+    except ValueError as exc:
+        await interaction.response.send_message(str(exc), ephemeral=False)
+        return
     await interaction.response.send_message(
-        "Стоимость чертежа для '{recipe}' установлена на {cost}".format(
-            recipe=recipe_name,
-            cost=_format_decimal(cost),
-        ),
+        success_template.format(recipe=recipe_name, cost=_format_decimal(cost)),
         ephemeral=False,
     )
 
 
-@set_recipe_blueprint_cost_command.autocomplete("recipe_name")
-async def set_recipe_blueprint_cost_autocomplete(
-    interaction: discord.Interaction, current: str
-) -> list[app_commands.Choice[str]]:
-    del interaction
-    recipe_names = await database.search_recipe_names(current)
-    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+@bot.tree.command(
+    name="set_recipe_blueprint_cost",
+    description="Установить стоимость чертежа рецепта",
+)
+@app_commands.checks.has_permissions(manage_guild=True)
+@app_commands.describe(
+    recipe_name="Название рецепта",
+    value="Стоимость чертежа",
+)
+async def set_recipe_blueprint_cost_command(
+    interaction: discord.Interaction,
+    recipe_name: str,
+    value: float,
+) -> None:
+    await _set_recipe_cost(
+        interaction,
+        "set_recipe_blueprint_cost",
+        recipe_name,
+        value,
+        database.set_recipe_blueprint_cost,
+        "Стоимость чертежа для '{recipe}' установлена на {cost}",
+    )
+
+
+set_recipe_blueprint_cost_command.autocomplete("recipe_name")(_recipe_name_autocomplete)
 
 
 @bot.tree.command(
@@ -614,50 +634,19 @@ async def set_blueprint_creation_cost_command(
     recipe_name: str,
     value: float,
 ) -> None:
-    logger.info(
-        "Получена команда set_blueprint_creation_cost: пользователь=%s, рецепт=%s, стоимость=%s",
-        interaction.user,
+    await _set_recipe_cost(
+        interaction,
+        "set_blueprint_creation_cost",
         recipe_name,
         value,
-    )
-    try:
-        cost = parse_decimal(str(value))
-    except ValueError:
-        await interaction.response.send_message(
-            "Стоимость должна быть числом",
-            ephemeral=False,
-        )
-        return
-    if cost < 0:
-        await interaction.response.send_message(
-            "Стоимость не может быть отрицательной",
-            ephemeral=False,
-        )
-        return
-    try:
-        await database.set_recipe_blueprint_creation_cost(recipe_name, cost)
-    except RecipeNotFoundError:
-        await interaction.response.send_message(
-            f"Рецепт '{recipe_name}' не найден",
-            ephemeral=False,
-        )
-        return
-    await interaction.response.send_message(
-        "Стоимость создания чертежа для '{recipe}' установлена на {cost}".format(
-            recipe=recipe_name,
-            cost=_format_decimal(cost),
-        ),
-        ephemeral=False,
+        database.set_recipe_blueprint_creation_cost,
+        "Стоимость создания чертежа для '{recipe}' установлена на {cost}",
     )
 
 
-@set_blueprint_creation_cost_command.autocomplete("recipe_name")
-async def set_blueprint_creation_cost_autocomplete(
-    interaction: discord.Interaction, current: str
-) -> list[app_commands.Choice[str]]:
-    del interaction
-    recipe_names = await database.search_recipe_names(current)
-    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+set_blueprint_creation_cost_command.autocomplete("recipe_name")(
+    _recipe_name_autocomplete
+)
 
 
 @bot.tree.command(
@@ -674,50 +663,17 @@ async def set_recipe_creation_cost_command(
     recipe_name: str,
     value: float,
 ) -> None:
-    logger.info(
-        "Получена команда set_recipe_creation_cost: пользователь=%s, рецепт=%s, стоимость=%s",
-        interaction.user,
+    await _set_recipe_cost(
+        interaction,
+        "set_recipe_creation_cost",
         recipe_name,
         value,
-    )
-    try:
-        cost = parse_decimal(str(value))
-    except ValueError:
-        await interaction.response.send_message(
-            "Стоимость должна быть числом",
-            ephemeral=False,
-        )
-        return
-    if cost < 0:
-        await interaction.response.send_message(
-            "Стоимость не может быть отрицательной",
-            ephemeral=False,
-        )
-        return
-    try:
-        await database.set_recipe_creation_cost(recipe_name, cost)
-    except RecipeNotFoundError:
-        await interaction.response.send_message(
-            f"Рецепт '{recipe_name}' не найден",
-            ephemeral=False,
-        )
-        return
-    await interaction.response.send_message(
-        "Цена создания для '{recipe}' установлена на {cost}".format(
-            recipe=recipe_name,
-            cost=_format_decimal(cost),
-        ),
-        ephemeral=False,
+        database.set_recipe_creation_cost,
+        "Цена создания для '{recipe}' установлена на {cost}",
     )
 
 
-@set_recipe_creation_cost_command.autocomplete("recipe_name")
-async def set_recipe_creation_cost_autocomplete(
-    interaction: discord.Interaction, current: str
-) -> list[app_commands.Choice[str]]:
-    del interaction
-    recipe_names = await database.search_recipe_names(current)
-    return [app_commands.Choice(name=name, value=name) for name in recipe_names]
+set_recipe_creation_cost_command.autocomplete("recipe_name")(_recipe_name_autocomplete)
 
 
 @bot.tree.command(name="set_efficiency", description="Установить глобальную эффективность")
@@ -732,7 +688,7 @@ async def set_efficiency_command(interaction: discord.Interaction, value: float)
         value,
     )
     try:
-        efficiency = parse_decimal(str(value))
+        efficiency = _float_to_decimal(value)
     except ValueError:
         await interaction.response.send_message(
             "Эффективность должна быть числом", ephemeral=False
@@ -776,7 +732,7 @@ async def set_ship_type_efficiency_command(
         )
         return
     try:
-        efficiency = parse_decimal(str(value))
+        efficiency = _float_to_decimal(value)
     except ValueError:
         await interaction.response.send_message(
             "Эффективность должна быть числом", ephemeral=False
@@ -788,7 +744,11 @@ async def set_ship_type_efficiency_command(
         )
         return
 
-    await database.set_ship_type_efficiency(normalised_type, efficiency)
+    try:
+        await database.set_ship_type_efficiency(normalised_type, efficiency)
+    except ValueError as exc:
+        await interaction.response.send_message(str(exc), ephemeral=False)
+        return
     await refresh_settings_console_message()
     await interaction.response.send_message(
         "Эффективность для типа '{type}' установлена на {value}%".format(
@@ -885,16 +845,16 @@ async def ship_type_efficiencies_command(
         lines.append("Типы кораблей не настроены.")
     else:
         lines.append("Настройки по типам:")
-        handled = set()
+        recipe_counts = {}
+        unassigned_count = None
         for entry in stats:
-            ship_type = entry["ship_type"]
-            recipe_count = entry["recipe_count"]
-            if ship_type is None:
-                lines.append(
-                    f"• Не указан: рецептов {recipe_count}"
-                )
-                continue
-            handled.add(ship_type)
+            if entry["ship_type"] is None:
+                unassigned_count = entry["recipe_count"]
+            else:
+                recipe_counts[entry["ship_type"]] = entry["recipe_count"]
+        ship_types = sorted(recipe_counts.keys() | type_efficiencies.keys(), key=str.lower)
+        for ship_type in ship_types:
+            recipe_count = recipe_counts.get(ship_type, 0)
             efficiency = type_efficiencies.get(ship_type)
             if efficiency is None:
                 lines.append(
@@ -908,15 +868,8 @@ async def ship_type_efficiencies_command(
                         count=recipe_count,
                     )
                 )
-        for ship_type, efficiency in type_efficiencies.items():
-            if ship_type in handled:
-                continue
-            lines.append(
-                "• {type}: {value}% (рецептов 0)".format(
-                    type=ship_type,
-                    value=_format_decimal(efficiency),
-                )
-            )
+        if unassigned_count is not None:
+            lines.append(f"• Не указан: рецептов {unassigned_count}")
 
     await interaction.response.send_message("\n".join(lines), ephemeral=False)
 
@@ -1113,6 +1066,15 @@ graph_group = app_commands.Group(
 )
 
 
+async def _ensure_guild(interaction: discord.Interaction) -> bool:
+    if interaction.guild is not None:
+        return True
+    await interaction.response.send_message(
+        "Команда доступна только на сервере.", ephemeral=True
+    )
+    return False
+
+
 @graph_group.command(name="set_channel", description="Указать канал для заявок на крафт")
 @app_commands.checks.has_permissions(manage_guild=True)
 @app_commands.describe(channel="Канал, где будет размещена кнопка создания заявки")
@@ -1124,10 +1086,7 @@ async def graph_set_channel_command(
         interaction.user,
         channel,
     )
-    if interaction.guild is None:
-        await interaction.response.send_message(
-            "Команда доступна только на сервере.", ephemeral=True
-        )
+    if not await _ensure_guild(interaction):
         return
 
     await interaction.response.defer(ephemeral=True, thinking=True)
@@ -1194,10 +1153,7 @@ async def graph_add_role_command(
         interaction.user,
         role,
     )
-    if interaction.guild is None:
-        await interaction.response.send_message(
-            "Команда доступна только на сервере.", ephemeral=True
-        )
+    if not await _ensure_guild(interaction):
         return
 
     await interaction.response.defer(ephemeral=True)
@@ -1220,10 +1176,7 @@ async def graph_remove_role_command(
         interaction.user,
         role,
     )
-    if interaction.guild is None:
-        await interaction.response.send_message(
-            "Команда доступна только на сервере.", ephemeral=True
-        )
+    if not await _ensure_guild(interaction):
         return
 
     await interaction.response.defer(ephemeral=True)
@@ -1241,10 +1194,7 @@ async def graph_clear_roles_command(interaction: discord.Interaction) -> None:
     logger.info(
         "Получена команда graph clear_roles: пользователь=%s", interaction.user
     )
-    if interaction.guild is None:
-        await interaction.response.send_message(
-            "Команда доступна только на сервере.", ephemeral=True
-        )
+    if not await _ensure_guild(interaction):
         return
 
     await interaction.response.defer(ephemeral=True)
@@ -1260,10 +1210,7 @@ async def graph_list_roles_command(interaction: discord.Interaction) -> None:
     logger.info(
         "Получена команда graph list_roles: пользователь=%s", interaction.user
     )
-    if interaction.guild is None:
-        await interaction.response.send_message(
-            "Команда доступна только на сервере.", ephemeral=True
-        )
+    if not await _ensure_guild(interaction):
         return
 
     role_ids = await get_graph_request_role_ids()
@@ -82,9 +82,11 @@ async def get_graph_request_message_id() -> Optional[int]:
 
 
 async def set_graph_request_message(channel_id: int, message_id: int) -> None:
-    await set_graph_request_channel_id(channel_id)
-    await database.set_config_value(
-        GRAPH_REQUEST_MESSAGE_CONFIG_KEY, str(message_id)
+    await database.set_config_values(
+        {
+            GRAPH_REQUEST_CHANNEL_CONFIG_KEY: str(channel_id),
+            GRAPH_REQUEST_MESSAGE_CONFIG_KEY: str(message_id),
+        }
     )
 
 
@@ -105,12 +105,8 @@ class RecipeApprovalView(discord.ui.View):
         )
 
 
-def parse_recipe_table(raw_table: str) -> list[RecipeComponent]:
-    logger.debug("Начинаю разбор таблицы рецепта")
-    lines = [line.strip() for line in raw_table.splitlines() if line.strip()]
-    components: list[RecipeComponent] = []
-    splitter = re.compile(r"\t|\s{2,}")
-    header_keywords = {
+_HEADER_KEYWORDS = frozenset(
+    {
         "id",
         "название",
         "названия",
@@ -123,27 +119,36 @@ def parse_recipe_table(raw_table: str) -> list[RecipeComponent]:
         "valuation",
         "cost",
     }
-    separator_class = " _'\u00A0\u202F\u2000-\u200A.,"
-    number_pattern = (
-        r"(?:\d{1,3}(?:["
-        + separator_class
-        + r"]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?)"
-    )
-    inline_pattern = re.compile(
-        rf"(?<!\S)(\d+)\s+(.+?)\s+({number_pattern})\s+({number_pattern})(?=(?:\s+\d+)|\s*$)"
-    )
+)
+_COLUMN_SPLITTER = re.compile(r"\t|\s{2,}")
+_DIGIT_PATTERN = re.compile(r"\d")
+_SEPARATOR_CLASS = " _'\u00A0\u202F\u2000-\u200A.,"
+_NUMBER_PATTERN = (
+    r"(?:\d{1,3}(?:["
+    + _SEPARATOR_CLASS
+    + r"]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?)"
+)
+_INLINE_ROW_PATTERN = re.compile(
+    rf"(?<!\S)(\d+)\s+(.+?)\s+({_NUMBER_PATTERN})\s+({_NUMBER_PATTERN})(?=(?:\s+\d+)|\s*$)"
+)
+
+
+def parse_recipe_table(raw_table: str) -> list[RecipeComponent]:
+    logger.debug("Начинаю разбор таблицы рецепта")
+    lines = [line.strip() for line in raw_table.splitlines() if line.strip()]
+    components: list[RecipeComponent] = []
 
     for line in lines:
         normalised = line.replace("\u200b", "")  # remove zero-width spaces
         if not normalised:
             continue
 
-        if not re.search(r"\d", normalised):
+        if not _DIGIT_PATTERN.search(normalised):
             lower_normalised = normalised.lower()
-            if any(keyword in lower_normalised for keyword in header_keywords):
+            if any(keyword in lower_normalised for keyword in _HEADER_KEYWORDS):
                 continue
 
-        matches = list(inline_pattern.finditer(normalised))
+        matches = list(_INLINE_ROW_PATTERN.finditer(normalised))
         if matches:
             for match in matches:
                 resource_name = match.group(2).strip()
@@ -161,10 +166,10 @@ def parse_recipe_table(raw_table: str) -> list[RecipeComponent]:
                 components.append(RecipeComponent(resource_name, quantity, unit_price))
             continue
 
-        parts = [part.strip() for part in splitter.split(normalised) if part.strip()]
+        parts = [part.strip() for part in _COLUMN_SPLITTER.split(normalised) if part.strip()]
         if not parts:
             continue
-        if all(part.lower() in header_keywords for part in parts):
+        if all(part.lower() in _HEADER_KEYWORDS for part in parts):
             continue
 
         if len(parts) < 4:
@@ -4,6 +4,7 @@ import asyncio
 import logging
 import os
 import shlex
+import signal
 import tempfile
 from asyncio import subprocess
 from typing import Optional
@@ -12,6 +13,8 @@ from .env import env_flag
 
 logger = logging.getLogger(__name__)
 
+GIT_PULL_TIMEOUT = 120
+
 
 async def pull_latest_code() -> str:
     logger.info("Запускаю обновление кода из GitHub")
@@ -46,6 +49,7 @@ async def pull_latest_code() -> str:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             env=env,
+            start_new_session=True,
         )
     except Exception:
         if askpass_path:
@@ -58,12 +62,28 @@ async def pull_latest_code() -> str:
     if process is None:
         raise RuntimeError("Не удалось запустить git pull")
 
-    stdout, stderr = await process.communicate()
-    if askpass_path:
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(), GIT_PULL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        # git runs its transport helpers as child processes that keep the pipes
+        # open, so the whole process group is killed.
         try:
-            os.remove(askpass_path)
-        except FileNotFoundError:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
             pass
+        await process.wait()
+        logger.error("Команда git pull не завершилась за %s секунд", GIT_PULL_TIMEOUT)
+        raise RuntimeError(
+            f"git pull не завершился за {GIT_PULL_TIMEOUT} секунд"
+        ) from None
+    finally:
+        if askpass_path:
+            try:
+                os.remove(askpass_path)
+            except FileNotFoundError:
+                pass
     if process.returncode != 0:
         error_output = stderr.decode().strip() or stdout.decode().strip()
         logger.error(